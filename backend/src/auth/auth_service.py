@@ -108,7 +108,7 @@ class AuthService:
             if error_code == 'UsernameExistsException':
                 raise AuthorizationError(
                     'An account with this email already exists',
-                    {'email': email}
+                    {'code': error_code, 'email': email}
                 )
             elif error_code == 'InvalidPasswordException':
                 raise ValidationError(
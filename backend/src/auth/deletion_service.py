@@ -142,33 +142,24 @@ class DeletionService:
         
         # 1. Delete all transactions
         try:
-            transactions = self._get_all_user_items(self.transactions_table, user_id)
-            for txn in transactions:
-                self.transactions_table.delete_item(
-                    Key={'PK': txn['PK'], 'SK': txn['SK']}
-                )
+            transactions = self._get_all_user_items(self.transactions_table, user_id, keys_only=True)
+            self._batch_delete(self.transactions_table, transactions)
             deletion_summary['transactions'] = len(transactions)
         except Exception as e:
             print(f"Error deleting transactions: {str(e)}")
         
         # 2. Delete all reports
         try:
-            reports = self._get_all_user_items(self.reports_table, user_id)
-            for report in reports:
-                self.reports_table.delete_item(
-                    Key={'PK': report['PK'], 'SK': report['SK']}
-                )
+            reports = self._get_all_user_items(self.reports_table, user_id, keys_only=True)
+            self._batch_delete(self.reports_table, reports)
             deletion_summary['reports'] = len(reports)
         except Exception as e:
             print(f"Error deleting reports: {str(e)}")
         
         # 3. Delete all conversations
         try:
-            conversations = self._get_all_user_items(self.conversations_table, user_id)
-            for conv in conversations:
-                self.conversations_table.delete_item(
-                    Key={'PK': conv['PK'], 'SK': conv['SK']}
-                )
+            conversations = self._get_all_user_items(self.conversations_table, user_id, keys_only=True)
+            self._batch_delete(self.conversations_table, conversations)
             deletion_summary['conversations'] = len(conversations)
         except Exception as e:
             print(f"Error deleting conversations: {str(e)}")
@@ -264,21 +255,29 @@ class DeletionService:
         
         return summary
     
-    def _get_all_user_items(self, table, user_id: str) -> List[Dict]:
-        """Query all items for a user from a DynamoDB table."""
+    def _get_all_user_items(self, table, user_id: str, keys_only: bool = False) -> List[Dict]:
+        """
+        Query all items for a user from a DynamoDB table.
+        
+        Args:
+            table: DynamoDB table resource
+            user_id: User identifier
+            keys_only: Project only PK/SK (enough for deletes)
+        """
         items = []
+        query_kwargs = {'KeyConditionExpression': Key('PK').eq(f'USER#{user_id}')}
+        if keys_only:
+            query_kwargs['ProjectionExpression'] = 'PK, SK'
         
         try:
-            response = table.query(
-                KeyConditionExpression=Key('PK').eq(f'USER#{user_id}')
-            )
+            response = table.query(**query_kwargs)
             items.extend(response.get('Items', []))
             
             # Handle pagination
             while 'LastEvaluatedKey' in response:
                 response = table.query(
-                    KeyConditionExpression=Key('PK').eq(f'USER#{user_id}'),
-                    ExclusiveStartKey=response['LastEvaluatedKey']
+                    ExclusiveStartKey=response['LastEvaluatedKey'],
+                    **query_kwargs
                 )
                 items.extend(response.get('Items', []))
         except Exception as e:
@@ -286,6 +285,15 @@ class DeletionService:
         
         return items
     
+    def _batch_delete(self, table, keys: List[Dict]) -> None:
+        """Delete items by key in BatchWriteItem requests of up to 25."""
+        if not keys:
+            return
+        
+        with table.batch_writer() as batch:
+            for key in keys:
+                batch.delete_item(Key={'PK': key['PK'], 'SK': key['SK']})
+    
     def _delete_user_s3_files(self, user_id: str) -> int:
         """Delete all S3 files for a user."""
         prefix = f"users/{user_id}/"
@@ -3,7 +3,7 @@ import json
 import boto3
 from typing import List, Dict, Any
 from common.config import config
-from common.models import CATEGORIES, Transaction
+from common.models import CATEGORIES, CATEGORIES_SET, Transaction
 from common.errors import ExternalServiceError
 
 
@@ -191,7 +191,7 @@ Important: Respond ONLY with the JSON array, no other text."""
                 reasoning = result.get('reasoning', 'No reasoning provided')
                 
                 # Validate category
-                if category not in CATEGORIES:
+                if category not in CATEGORIES_SET:
                     category = 'Other'
                     confidence = 0.0
                 
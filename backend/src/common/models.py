@@ -3,9 +3,9 @@ from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
-    """Transaction data model."""
+    """Transaction data model (slotted: one instance per imported row)."""
     id: str
     userId: str
     date: datetime
@@ -118,3 +118,6 @@ CATEGORIES = [
     'Transfers',
     'Other'
 ]
+
+# Set view of the taxonomy for O(1) membership checks
+CATEGORIES_SET = frozenset(CATEGORIES)
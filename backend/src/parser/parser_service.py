@@ -13,6 +13,43 @@ from common.errors import ProcessingError, ValidationError
 from common.models import Transaction
 
 
+# Header keywords per transaction field, in priority order (earlier keywords win)
+_COLUMN_KEYWORDS = {
+    'date': ('date', 'transaction date', 'posting date', 'trans date'),
+    'description': ('description', 'memo', 'details', 'transaction', 'merchant', 'payee'),
+    'amount': ('amount', 'debit', 'credit', 'value', 'transaction amount'),
+    'balance': ('balance', 'running balance', 'account balance'),  # optional
+}
+
+# Common statement date formats, tried with strptime before falling back to
+# dateutil. Each one reads dates exactly as dateutil would (month-first, no
+# two-digit years), so the order they are tried in never changes the result.
+_DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%Y/%m/%d',
+    '%d-%b-%Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+)
+
+
+# DynamoDB's BatchWriteItem limit
+_BATCH_WRITE_SIZE = 25
+
+# Currency symbols and thousands separators, deleted in a single pass
+_AMOUNT_STRIP = str.maketrans('', '', '$,£€')
+
+
+def _clean_amount(value: str) -> str:
+    """Strip currency formatting from an amount; '(12.50)' becomes '-12.50'."""
+    cleaned = value.translate(_AMOUNT_STRIP).strip()
+    # Handle parentheses for negative numbers
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = '-' + cleaned[1:-1]
+    return cleaned
+
+
 class ParserService:
     """Handles parsing of CSV and PDF bank statements."""
     
@@ -22,6 +59,9 @@ class ParserService:
         self.transactions_table = self.dynamodb.Table(config.DYNAMODB_TABLE_TRANSACTIONS)
         self.bedrock = boto3.client('bedrock-runtime', region_name=config.BEDROCK_REGION)
         
+        # Date format that matched the previous row; statements rarely mix formats
+        self._last_date_fmt = None
+        
         # Import PDF libraries only when needed
         try:
             from PyPDF2 import PdfReader
@@ -45,16 +85,17 @@ class ParserService:
             ProcessingError: If parsing fails
         """
         try:
-            # Download file from S3
+            # Stream the file from S3, decoding as csv reads instead of
+            # holding both the raw bytes and the decoded text in memory
             response = self.s3.get_object(Bucket=s3_bucket, Key=s3_key)
-            content = response['Body'].read().decode('utf-8')
+            content = io.TextIOWrapper(response['Body'], encoding='utf-8', newline='')
             
             # Parse CSV
             transactions = []
-            csv_reader = csv.DictReader(io.StringIO(content))
+            csv_reader = csv.reader(content)
             
             # Detect column mappings
-            headers = csv_reader.fieldnames
+            headers = next(csv_reader, None)
             if not headers:
                 raise ProcessingError(
                     'CSV file has no headers',
@@ -63,9 +104,34 @@ class ParserService:
             
             column_mapping = self._detect_column_mapping(headers)
             
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
+            # Resolve the mapped columns to row positions once, so each row is
+            # read by index instead of through a per-row dict. Like DictReader,
+            # a repeated header name resolves to its last column.
+            positions = {name: i for i, name in enumerate(headers)}
+            date_idx = positions[column_mapping['date']]
+            description_idx = positions[column_mapping['description']]
+            amount_idx = positions[column_mapping['amount']]
+            balance_idx = positions[column_mapping['balance']] if 'balance' in column_mapping else None
+            
+            # One import timestamp for every row of the file
+            created_at = datetime.now(UTC)
+            
+            # Statements repeat the same merchants; rows with equal descriptions
+            # share one string object for the life of the import
+            descriptions = {}
+            
+            # Blank lines are skipped before numbering, as DictReader did
+            for row_num, row in enumerate(filter(None, csv_reader), start=2):  # Start at 2 (header is row 1)
                 try:
-                    transaction = self._parse_csv_row(row, column_mapping, user_id, s3_key)
+                    description = row[description_idx].strip()
+                    description = descriptions.setdefault(description, description)
+                    transaction = self._build_transaction(
+                        row[date_idx].strip(),
+                        description,
+                        row[amount_idx].strip(),
+                        row[balance_idx].strip() if balance_idx is not None else None,
+                        user_id, s3_key, str(row), created_at
+                    )
                     if transaction:
                         transactions.append(transaction)
                 except Exception as e:
@@ -438,45 +504,15 @@ class ParserService:
         headers_lower = [h.lower().strip() for h in headers]
         mapping = {}
         
-        # Date column
-        date_keywords = ['date', 'transaction date', 'posting date', 'trans date']
-        for keyword in date_keywords:
-            for i, header in enumerate(headers_lower):
-                if keyword in header:
-                    mapping['date'] = headers[i]
-                    break
-            if 'date' in mapping:
-                break
-        
-        # Description column
-        desc_keywords = ['description', 'memo', 'details', 'transaction', 'merchant', 'payee']
-        for keyword in desc_keywords:
-            for i, header in enumerate(headers_lower):
-                if keyword in header:
-                    mapping['description'] = headers[i]
+        # Earliest keyword wins; among headers containing it, the leftmost
+        for field, keywords in _COLUMN_KEYWORDS.items():
+            for keyword in keywords:
+                for i, header in enumerate(headers_lower):
+                    if keyword in header and not (field == 'amount' and 'balance' in header):
+                        mapping[field] = headers[i]
+                        break
+                if field in mapping:
                     break
-            if 'description' in mapping:
-                break
-        
-        # Amount column
-        amount_keywords = ['amount', 'debit', 'credit', 'value', 'transaction amount']
-        for keyword in amount_keywords:
-            for i, header in enumerate(headers_lower):
-                if keyword in header and 'balance' not in header:
-                    mapping['amount'] = headers[i]
-                    break
-            if 'amount' in mapping:
-                break
-        
-        # Balance column (optional)
-        balance_keywords = ['balance', 'running balance', 'account balance']
-        for keyword in balance_keywords:
-            for i, header in enumerate(headers_lower):
-                if keyword in header:
-                    mapping['balance'] = headers[i]
-                    break
-            if 'balance' in mapping:
-                break
         
         # Validate required fields
         required_fields = ['date', 'description', 'amount']
@@ -490,7 +526,8 @@ class ParserService:
         return mapping
     
     def _parse_csv_row(self, row: Dict[str, str], column_mapping: Dict[str, str], 
-                       user_id: str, source_file: str) -> Optional[Transaction]:
+                       user_id: str, source_file: str,
+                       created_at: Optional[datetime] = None) -> Optional[Transaction]:
         """
         Parse a single CSV row into a Transaction.
         
@@ -499,6 +536,7 @@ class ParserService:
             column_mapping: Column name mapping
             user_id: User ID
             source_file: Source file path
+            created_at: Import timestamp shared by the file's rows (defaults to now)
             
         Returns:
             Transaction object or None if row is invalid
@@ -509,13 +547,38 @@ class ParserService:
         amount_str = row.get(column_mapping['amount'], '').strip()
         balance_str = row.get(column_mapping.get('balance', ''), '').strip() if 'balance' in column_mapping else None
         
+        return self._build_transaction(
+            date_str, description, amount_str, balance_str,
+            user_id, source_file, str(row), created_at
+        )
+    
+    def _build_transaction(self, date_str: str, description: str, amount_str: str,
+                           balance_str: Optional[str], user_id: str, source_file: str,
+                           raw_data: str,
+                           created_at: Optional[datetime] = None) -> Optional[Transaction]:
+        """
+        Build a Transaction from a row's stripped field values.
+        
+        Args:
+            date_str: Date cell
+            description: Description cell
+            amount_str: Amount cell
+            balance_str: Balance cell, or None when the file has no balance column
+            user_id: User ID
+            source_file: Source file path
+            raw_data: Original row, kept on the transaction for reference
+            created_at: Import timestamp shared by the file's rows (defaults to now)
+            
+        Returns:
+            Transaction object or None if row is invalid
+        """
         # Skip empty rows
         if not date_str or not description or not amount_str:
             return None
         
         # Parse date
         try:
-            transaction_date = date_parser.parse(date_str)
+            transaction_date = self._parse_date(date_str)
         except Exception:
             raise ValidationError(
                 f'Invalid date format: {date_str}',
@@ -524,12 +587,7 @@ class ParserService:
         
         # Parse amount
         try:
-            # Remove currency symbols and commas
-            amount_clean = amount_str.replace('$', '').replace(',', '').replace('£', '').replace('€', '').strip()
-            # Handle parentheses for negative numbers
-            if amount_clean.startswith('(') and amount_clean.endswith(')'):
-                amount_clean = '-' + amount_clean[1:-1]
-            amount = float(amount_clean)
+            amount = float(_clean_amount(amount_str))
         except Exception:
             raise ValidationError(
                 f'Invalid amount format: {amount_str}',
@@ -540,10 +598,7 @@ class ParserService:
         balance = None
         if balance_str:
             try:
-                balance_clean = balance_str.replace('$', '').replace(',', '').replace('£', '').replace('€', '').strip()
-                if balance_clean.startswith('(') and balance_clean.endswith(')'):
-                    balance_clean = '-' + balance_clean[1:-1]
-                balance = float(balance_clean)
+                balance = float(_clean_amount(balance_str))
             except Exception:
                 # Balance is optional, so we can ignore parsing errors
                 pass
@@ -559,10 +614,48 @@ class ParserService:
             amount=amount,
             balance=balance,
             sourceFile=source_file,
-            rawData=str(row),
-            createdAt=datetime.now(UTC)
+            rawData=raw_data,
+            createdAt=created_at or datetime.now(UTC)
         )
     
+    def _parse_date(self, date_str: str) -> datetime:
+        """
+        Parse a statement date, trying the last matching format first.
+        
+        Args:
+            date_str: Raw date string from the CSV row
+            
+        Returns:
+            Parsed datetime
+        """
+        # Plain ISO dates (YYYY-MM-DD) are the common case; fromisoformat
+        # parses them in C, far cheaper than strptime's regex machinery
+        if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+            try:
+                return datetime.fromisoformat(date_str)
+            except ValueError:
+                pass
+        
+        last_fmt = self._last_date_fmt
+        if last_fmt:
+            try:
+                return datetime.strptime(date_str, last_fmt)
+            except ValueError:
+                pass
+        
+        for fmt in _DATE_FORMATS:
+            if fmt == last_fmt:
+                continue
+            try:
+                parsed = datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+            self._last_date_fmt = fmt
+            return parsed
+        
+        # Anything else (ISO timestamps, day-first dates, ...) goes to dateutil
+        return date_parser.parse(date_str)
+    
     def detect_duplicates(self, transactions: List[Transaction], user_id: str) -> List[Transaction]:
         """
         Filter out duplicate transactions.
@@ -624,7 +717,7 @@ class ParserService:
             amount: Transaction amount
             
         Returns:
-            SHA256 hash
+            BLAKE2b hash (128-bit; dedup keys only, not a security boundary)
         """
         # Normalize inputs
         date_normalized = date[:10] if len(date) >= 10 else date  # Use just the date part
@@ -633,19 +726,24 @@ class ParserService:
         
         # Create hash
         hash_input = f'{date_normalized}|{description_normalized}|{amount_normalized}'
-        return hashlib.sha256(hash_input.encode()).hexdigest()
+        return hashlib.blake2b(hash_input.encode(), digest_size=16).hexdigest()
     
     def store_transactions(self, transactions: List[Transaction]) -> int:
         """
         Store transactions in DynamoDB.
         
+        Items are written one BatchWriteItem request (up to 25 items) at a
+        time, with unprocessed items retried. If a request still fails, its
+        items are logged and left out of the returned count, and the rest are
+        still written.
+        
         Args:
             transactions: List of transactions to store
             
         Returns:
             Number of transactions stored
         """
-        stored_count = 0
+        items = []
         
         for transaction in transactions:
             try:
@@ -672,12 +770,25 @@ class ParserService:
                 if transaction.balance is not None:
                     item['balance'] = str(transaction.balance)
                 
-                # Store in DynamoDB
-                self.transactions_table.put_item(Item=item)
-                stored_count += 1
+                items.append(item)
                 
             except Exception as e:
                 print(f'Warning: Failed to store transaction {transaction.id}: {str(e)}')
                 # Continue storing other transactions
         
+        stored_count = 0
+        
+        # One batch writer per request-sized chunk, so a failed flush only
+        # loses (and un-counts) the items that were in that request
+        for start in range(0, len(items), _BATCH_WRITE_SIZE):
+            chunk = items[start:start + _BATCH_WRITE_SIZE]
+            try:
+                with self.transactions_table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+                    for item in chunk:
+                        batch.put_item(Item=item)
+            except Exception as e:
+                print(f'Warning: Failed to store {len(chunk)} transactions: {str(e)}')
+                continue
+            stored_count += len(chunk)
+        
         return stored_count
@@ -3,6 +3,7 @@ Lambda function for retrieving spending predictions.
 """
 
 import json
+from datetime import datetime, UTC
 from typing import Dict, Any
 
 from prediction.prediction_service import PredictionService
@@ -50,8 +51,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             categories = ['Dining', 'Transportation', 'Utilities', 'Entertainment', 
                          'Shopping', 'Healthcare', 'Housing']
             predictions = []
+            # One window end for every category, so they share a key condition
+            as_of = datetime.now(UTC)
             for cat in categories:
-                pred = service.predict_spending(user_id, cat, horizon)
+                pred = service.predict_spending(user_id, cat, horizon, as_of=as_of)
                 if pred['confidence'] > 0:  # Only include if we have data
                     predictions.append(pred)
             data = predictions
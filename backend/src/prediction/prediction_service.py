@@ -5,17 +5,41 @@ Generates spending forecasts and alerts based on historical patterns.
 """
 
 from datetime import datetime, timedelta, UTC
-from decimal import Decimal
+import ast
 from typing import Dict, List, Optional
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import math
 import boto3
-from boto3.dynamodb.conditions import Key
-import json
+from boto3.dynamodb.conditions import Key, Attr
+import orjson
 
 from common.config import Config
 from common.errors import ValidationError
 
 
+# Predicted/historical spending ratios at which an alert escalates
+_CRITICAL_RATIO = 1.5
+_WARNING_RATIO = 1.3
+
+# Upper bound on concurrent Bedrock calls while building alerts
+_MAX_BEDROCK_WORKERS = 8
+
+
+@lru_cache(maxsize=256)
+def _range_condition(user_id: str, start: str, end: str):
+    """Key condition for a user's transactions between two ISO timestamps.
+    
+    Condition objects are never mutated by boto3, so one can serve every
+    query over the same window.
+    """
+    return Key('PK').eq(f'USER#{user_id}') & Key('SK').between(
+        f'TRANSACTION#{start}',
+        f'TRANSACTION#{end}~'
+    )
+
+
 class PredictionService:
     """Service for predicting spending and generating alerts."""
     
@@ -28,7 +52,8 @@ class PredictionService:
         self,
         user_id: str,
         category: str,
-        horizon_days: int = 30
+        horizon_days: int = 30,
+        as_of: Optional[datetime] = None
     ) -> Dict:
         """
         Predict spending for a category over the next N days.
@@ -39,23 +64,28 @@ class PredictionService:
             user_id: User identifier
             category: Category to predict
             horizon_days: Number of days to predict (default 30)
+            as_of: End of the history window (default now)
             
         Returns:
             Prediction with amount, confidence, and historical average
         """
         # Get historical data (last 90 days)
-        end_date = datetime.now(UTC)
+        end_date = as_of or datetime.now(UTC)
         start_date = end_date - timedelta(days=90)
         
-        transactions = self._get_transactions_in_range(user_id, start_date, end_date)
+        # DynamoDB filters by category and returns only the amounts
+        transactions = self._get_transactions_in_range(
+            user_id, start_date, end_date,
+            category=category,
+            attributes=('amount',)
+        )
         
-        # Filter by category and calculate spending
-        category_spending = []
-        for txn in transactions:
-            if txn.get('category') == category:
-                amount = abs(Decimal(str(txn.get('amount', 0))))
-                if amount > 0:
-                    category_spending.append(float(amount))
+        # Calculate spending; float() takes both the Decimal and the string
+        # amounts DynamoDB hands back, correctly rounded
+        category_spending = [
+            amount for amount in (abs(float(txn.get('amount', 0))) for txn in transactions)
+            if amount > 0
+        ]
         
         if len(category_spending) < 5:
             # Not enough data for prediction
@@ -69,7 +99,7 @@ class PredictionService:
             }
         
         # Calculate moving average
-        historical_avg = sum(category_spending) / len(category_spending)
+        historical_avg = math.fsum(category_spending) / len(category_spending)
         
         # Scale to prediction horizon (simple linear scaling)
         days_in_history = 90
@@ -77,7 +107,9 @@ class PredictionService:
         
         # Confidence based on data consistency (inverse of coefficient of variation)
         if historical_avg > 0:
-            std_dev = (sum((x - historical_avg) ** 2 for x in category_spending) / len(category_spending)) ** 0.5
+            std_dev = math.sqrt(
+                math.fsum((x - historical_avg) ** 2 for x in category_spending) / len(category_spending)
+            )
             cv = std_dev / historical_avg
             confidence = max(0.0, min(1.0, 1.0 - cv))
         else:
@@ -106,7 +138,9 @@ class PredictionService:
         end_date = datetime.now(UTC)
         start_date = end_date - timedelta(days=30)
         
-        transactions = self._get_transactions_in_range(user_id, start_date, end_date)
+        transactions = self._get_transactions_in_range(
+            user_id, start_date, end_date, attributes=('category',)
+        )
         
         # Get unique categories
         categories = set()
@@ -116,10 +150,13 @@ class PredictionService:
                 categories.add(category)
         
         alerts = []
+        pending = []  # (alert, historical_avg) awaiting Bedrock recommendations
+        threshold_ratio = Config.ALERT_THRESHOLD_PERCENTAGE / 100
         
         # Generate predictions for each category
         for category in categories:
-            prediction = self.predict_spending(user_id, category, horizon_days=30)
+            # Every category shares one window, and so one cached key condition
+            prediction = self.predict_spending(user_id, category, horizon_days=30, as_of=end_date)
             
             # Skip if insufficient data
             if prediction['confidence'] < 0.3:
@@ -129,34 +166,41 @@ class PredictionService:
             historical_avg = prediction['historicalAverage'] * prediction.get('dataPoints', 0) / 90 * 30
             
             # Generate alert if predicted spending exceeds threshold
-            threshold_percentage = Config.ALERT_THRESHOLD_PERCENTAGE
-            if prediction['predictedAmount'] > historical_avg * (threshold_percentage / 100):
-                severity = self._calculate_severity(
-                    prediction['predictedAmount'],
-                    historical_avg
-                )
+            if prediction['predictedAmount'] > historical_avg * threshold_ratio:
+                ratio = prediction['predictedAmount'] / historical_avg
+                severity = self._severity_for_ratio(ratio)
                 
-                # Generate recommendations using Bedrock
-                recommendations = self._generate_recommendations(
-                    category,
-                    prediction['predictedAmount'],
-                    historical_avg
-                )
-                
-                alerts.append({
+                alert = {
                     'id': f"alert-{user_id}-{category}-{datetime.now(UTC).timestamp()}",
                     'userId': user_id,
                     'category': category,
                     'message': f"Your {category} spending is predicted to be ${prediction['predictedAmount']:.2f} "
-                              f"in the next 30 days, which is {((prediction['predictedAmount'] / historical_avg - 1) * 100):.0f}% "
+                              f"in the next 30 days, which is {((ratio - 1) * 100):.0f}% "
                               f"higher than your average of ${historical_avg:.2f}",
                     'predictedAmount': prediction['predictedAmount'],
                     'historicalAverage': round(historical_avg, 2),
                     'severity': severity,
-                    'recommendations': recommendations,
+                    'recommendations': [],  # Filled in below
                     'confidence': prediction['confidence'],
                     'createdAt': datetime.now(UTC).isoformat()
-                })
+                }
+                alerts.append(alert)
+                pending.append((alert, historical_avg))
+        
+        # Generate recommendations using Bedrock; the calls are independent and
+        # network-bound, so they run concurrently (boto3 clients are thread-safe)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(_MAX_BEDROCK_WORKERS, len(pending))) as executor:
+                recommendation_lists = executor.map(
+                    lambda entry: self._generate_recommendations(
+                        entry[0]['category'],
+                        entry[0]['predictedAmount'],
+                        entry[1]
+                    ),
+                    pending
+                )
+                for (alert, _), recommendations in zip(pending, recommendation_lists):
+                    alert['recommendations'] = recommendations
         
         # Sort by severity and predicted amount
         severity_order = {'critical': 3, 'warning': 2, 'info': 1}
@@ -171,16 +215,33 @@ class PredictionService:
         self,
         user_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        category: Optional[str] = None,
+        attributes: Optional[tuple] = None
     ) -> List[Dict]:
-        """Query transactions within a date range."""
-        response = self.transactions_table.query(
-            KeyConditionExpression=Key('PK').eq(f'USER#{user_id}') & 
-                                 Key('SK').between(
-                                     f'TRANSACTION#{start_date.isoformat()}',
-                                     f'TRANSACTION#{end_date.isoformat()}~'
-                                 )
+        """
+        Query transactions within a date range.
+        
+        Args:
+            user_id: User identifier
+            start_date: Range start
+            end_date: Range end
+            category: Only return transactions in this category (filtered server-side)
+            attributes: Only return these attributes (projected server-side)
+        """
+        kwargs = dict(
+            KeyConditionExpression=_range_condition(
+                user_id, start_date.isoformat(), end_date.isoformat()
+            )
         )
+        if category:
+            kwargs['FilterExpression'] = Attr('category').eq(category)
+        if attributes:
+            # Placeholders keep attribute names clear of DynamoDB reserved words
+            kwargs['ProjectionExpression'] = ', '.join(f'#a{i}' for i in range(len(attributes)))
+            kwargs['ExpressionAttributeNames'] = {f'#a{i}': name for i, name in enumerate(attributes)}
+        
+        response = self.transactions_table.query(**kwargs)
         return response.get('Items', [])
     
     def _calculate_severity(self, predicted: float, historical: float) -> str:
@@ -188,11 +249,14 @@ class PredictionService:
         if historical == 0:
             return 'info'
         
-        ratio = predicted / historical
-        
-        if ratio >= 1.5:
+        return self._severity_for_ratio(predicted / historical)
+    
+    @staticmethod
+    def _severity_for_ratio(ratio: float) -> str:
+        """Map a predicted/historical spending ratio to an alert severity."""
+        if ratio >= _CRITICAL_RATIO:
             return 'critical'
-        elif ratio >= 1.3:
+        elif ratio >= _WARNING_RATIO:
             return 'warning'
         else:
             return 'info'
@@ -236,20 +300,24 @@ Example: ["Recommendation 1", "Recommendation 2", "Recommendation 3"]"""
             
             response = self.bedrock.invoke_model(
                 modelId=Config.BEDROCK_MODEL_ID,
-                body=json.dumps(request_body)
+                body=orjson.dumps(request_body)
             )
             
-            response_body = json.loads(response['body'].read())
+            # Read the body once and parse it straight from bytes
+            response_body = orjson.loads(response['body'].read())
             content = response_body['content'][0]['text']
             
             # Parse JSON response
-            # Handle markdown code blocks
-            if '```json' in content:
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif '```' in content:
-                content = content.split('```')[1].split('```')[0].strip()
+            # Handle markdown code blocks (keep the first fenced block)
+            if '```' in content:
+                content = content.partition('```')[2].partition('```')[0]
+                content = content.removeprefix('json').strip()
             
-            recommendations = json.loads(content)
+            try:
+                recommendations = orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # Models sometimes answer with a Python-style list ('single quotes')
+                recommendations = ast.literal_eval(content)
             
             if isinstance(recommendations, list):
                 return recommendations[:3]  # Limit to 3 recommendations
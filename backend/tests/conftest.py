@@ -1,8 +1,149 @@
 """Pytest configuration and fixtures."""
 import pytest
 import boto3
+# moto must load before any boto3 Session or client exists: importing it
+# registers the botocore handler that sessions copy when they are created
 from moto import mock_aws
+import gc
 import os
+import time
+from functools import lru_cache
+
+from common.config import Config
+
+
+# DynamoDB tables shared by the service tests (all use the PK/SK key schema)
+SHARED_TABLES = (
+    Config.DYNAMODB_TABLE_USERS,
+    Config.DYNAMODB_TABLE_TRANSACTIONS,
+    Config.DYNAMODB_TABLE_REPORTS,
+    Config.DYNAMODB_TABLE_CONVERSATIONS,
+)
+
+
+# Timed calls per benchmark (after one warmup call)
+BENCHMARK_ROUNDS = 5
+
+_benchmark_results = []
+
+
+def pytest_addoption(parser):
+    """Register the --benchmark switch for the benchmark fixture."""
+    parser.addoption(
+        '--benchmark', action='store_true', default=False,
+        help='time calls made through the benchmark fixture (runs the session serially)'
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    """Run serially under --benchmark; xdist workers would keep the timings to themselves."""
+    if config.getoption('--benchmark') and getattr(config.option, 'numprocesses', None):
+        config.option.numprocesses = 0
+        config.option.dist = 'no'
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report the timings collected by the benchmark fixture."""
+    if not _benchmark_results:
+        return
+    terminalreporter.section('benchmark')
+    for nodeid, best, mean in _benchmark_results:
+        terminalreporter.write_line(f'{nodeid}: min {best * 1000:.2f} ms, mean {mean * 1000:.2f} ms')
+
+
+@lru_cache(maxsize=None)
+def shared_session():
+    """
+    One boto3 Session for the test process.
+    
+    It is also installed as boto3's default session, so the services'
+    boto3.client()/boto3.resource() calls reuse its loaders and caches.
+    """
+    session = boto3.session.Session(region_name='us-east-1')
+    boto3.DEFAULT_SESSION = session
+    return session
+
+
+@lru_cache(maxsize=None)
+def shared_dynamodb_resource():
+    """Shared DynamoDB resource; moto intercepts at the HTTP layer, so one is enough."""
+    return shared_session().resource('dynamodb')
+
+
+@lru_cache(maxsize=None)
+def shared_dynamodb_client():
+    """Shared low-level DynamoDB client (no resource-layer (de)serialization hooks)."""
+    return shared_session().client('dynamodb')
+
+
+@lru_cache(maxsize=None)
+def shared_s3_client():
+    """Shared S3 client (service models are loaded once per process)."""
+    return shared_session().client('s3')
+
+
+def create_tables(dynamodb, table_names=SHARED_TABLES):
+    """Create PK/SK keyed tables on a mocked DynamoDB resource."""
+    for table_name in table_names:
+        dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+
+def bootstrap_aws():
+    """
+    Create the shared tables and bucket inside an active mock_aws() context.
+    
+    Returns:
+        (dynamodb resource, s3 client) tuple
+    """
+    dynamodb = shared_dynamodb_resource()
+    s3 = shared_s3_client()
+    create_tables(dynamodb)
+    s3.create_bucket(Bucket=Config.S3_BUCKET)
+    return dynamodb, s3
+
+
+@pytest.fixture
+def benchmark(request):
+    """
+    Call a function and return its result, timing it when --benchmark is given.
+    
+    Timed runs make one warmup call, then BENCHMARK_ROUNDS calls with garbage
+    collection disabled; the best and mean round appear in the summary.
+    """
+    enabled = request.config.getoption('--benchmark')
+    
+    def run(func, *args, **kwargs):
+        result = func(*args, **kwargs)
+        if not enabled:
+            return result
+        
+        timings = []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(BENCHMARK_ROUNDS):
+                start = time.perf_counter()
+                func(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        _benchmark_results.append((request.node.nodeid, min(timings), sum(timings) / len(timings)))
+        return result
+    
+    return run
 
 
 @pytest.fixture
@@ -15,22 +156,106 @@ def aws_credentials():
     os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
 
 
+@pytest.fixture(scope="session")
+def aws_session():
+    """The process-wide boto3 Session (see shared_session)."""
+    return shared_session()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def aws_mock(aws_session):
+    """Install moto's AWS mocks once for the whole session (once per xdist worker)."""
+    with mock_aws():
+        yield
+
+
+@pytest.fixture(scope="module")
+def aws_backend(aws_mock):
+    """
+    Create the shared tables and bucket once per test module.
+    
+    The session-wide mock never resets moto's state, so they are dropped again
+    when the module finishes and the next module starts from a clean backend.
+    """
+    dynamodb, s3 = bootstrap_aws()
+    yield dynamodb, s3
+    
+    delete_tables(dynamodb)
+    delete_bucket(s3)
+
+
+def clear_tables(dynamodb, table_names=SHARED_TABLES):
+    """Delete every item from the given tables with batched deletes."""
+    for table_name in table_names:
+        table = dynamodb.Table(table_name)
+        keys = table.scan(ProjectionExpression='PK, SK')['Items']
+        with table.batch_writer() as batch:
+            for key in keys:
+                batch.delete_item(Key=key)
+
+
+def bulk_put(table, items):
+    """
+    Seed plain-dict items in list order through one batch writer.
+    
+    The writer already splits them into 25-item BatchWriteItem requests;
+    boto3 resources are not thread-safe, so seeding stays on one thread.
+    """
+    with table.batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+
+
+def clear_bucket(s3, bucket=Config.S3_BUCKET):
+    """Empty a bucket with one delete_objects call per listed page (up to 1000 keys)."""
+    paginator = s3.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket):
+        objects = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+        if objects:
+            s3.delete_objects(Bucket=bucket, Delete={'Objects': objects})
+
+
+def delete_tables(dynamodb, table_names=SHARED_TABLES):
+    """Drop tables created during a module."""
+    for table_name in table_names:
+        dynamodb.Table(table_name).delete()
+
+
+def delete_bucket(s3, bucket=Config.S3_BUCKET):
+    """Empty and drop a bucket created during a module."""
+    clear_bucket(s3, bucket)
+    s3.delete_bucket(Bucket=bucket)
+
+
+@pytest.fixture
+def aws_resources(aws_backend):
+    """Hand out the shared backend and empty its tables and bucket after each test."""
+    yield aws_backend
+    
+    dynamodb, s3 = aws_backend
+    clear_tables(dynamodb)
+    clear_bucket(s3)
+
+
 @pytest.fixture
-def dynamodb_client(aws_credentials):
+def raw_dynamodb(aws_backend):
+    """Low-level DynamoDB client on the shared backend, for reading raw AttributeValues."""
+    return shared_dynamodb_client()
+
+
+@pytest.fixture
+def dynamodb_client(aws_credentials, aws_session):
     """Create mock DynamoDB client."""
-    with mock_aws():
-        yield boto3.client('dynamodb', region_name='us-east-1')
+    return aws_session.client('dynamodb')
 
 
 @pytest.fixture
-def s3_client(aws_credentials):
+def s3_client(aws_credentials, aws_session):
     """Create mock S3 client."""
-    with mock_aws():
-        yield boto3.client('s3', region_name='us-east-1')
+    return aws_session.client('s3')
 
 
 @pytest.fixture
-def cognito_client(aws_credentials):
+def cognito_client(aws_credentials, aws_session):
     """Create mock Cognito client."""
-    with mock_aws():
-        yield boto3.client('cognito-idp', region_name='us-east-1')
+    return aws_session.client('cognito-idp')
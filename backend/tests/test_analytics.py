@@ -6,35 +6,16 @@ import json
 import pytest
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
-from moto import mock_aws
-import boto3
 
 from analytics.analytics_service import AnalyticsService
 from analytics.get_analytics import lambda_handler
-from common.config import Config
 from common.errors import ValidationError
 
 
 @pytest.fixture
-def analytics_service():
-    """Create analytics service instance."""
-    with mock_aws():
-        # Create DynamoDB table
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        table = dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        yield AnalyticsService()
+def analytics_service(aws_resources):
+    """Create analytics service instance against the shared mocked AWS backend."""
+    return AnalyticsService()
 
 
 @pytest.fixture
@@ -1,10 +1,17 @@
 """Unit tests for authentication service."""
+import re
 import pytest
 from botocore.exceptions import ClientError
 from auth.auth_service import AuthService
 from common.errors import ValidationError, AuthorizationError
 
 
+# All password rules as a single lookahead intersection
+STRONG_PASSWORD = re.compile(
+    r'^(?=.{12,})(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*(),.?":{}|<>]).*$'
+)
+
+
 class TestPasswordValidation:
     """Test password complexity validation."""
     
@@ -19,37 +26,51 @@ class TestPasswordValidation:
     def test_password_too_short(self):
         """Test that short passwords are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='at least 12 characters'):
             auth.validate_password('Short1!')
-        assert 'at least 12 characters' in str(exc_info.value.message)
     
     def test_password_no_uppercase(self):
         """Test that passwords without uppercase are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='uppercase letter'):
             auth.validate_password('lowercase123!')
-        assert 'uppercase letter' in str(exc_info.value.message)
     
     def test_password_no_lowercase(self):
         """Test that passwords without lowercase are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='lowercase letter'):
             auth.validate_password('UPPERCASE123!')
-        assert 'lowercase letter' in str(exc_info.value.message)
     
     def test_password_no_number(self):
         """Test that passwords without numbers are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='number'):
             auth.validate_password('NoNumbersHere!')
-        assert 'number' in str(exc_info.value.message)
     
     def test_password_no_special_char(self):
         """Test that passwords without special characters are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='special character'):
             auth.validate_password('NoSpecialChar123')
-        assert 'special character' in str(exc_info.value.message)
+    
+    @pytest.mark.parametrize('password,valid', [
+        ('SecurePass123!', True),
+        ('MyP@ssw0rd2024', True),
+        ('Short1!', False),
+        ('lowercase123!', False),
+        ('UPPERCASE123!', False),
+        ('NoNumbersHere!', False),
+        ('NoSpecialChar123', False),
+    ])
+    def test_password_rules_matrix(self, password, valid):
+        """Test validator decisions agree with the combined password rules."""
+        auth = AuthService()
+        assert bool(STRONG_PASSWORD.match(password)) is valid
+        if valid:
+            auth.validate_password(password)
+        else:
+            with pytest.raises(ValidationError):
+                auth.validate_password(password)
 
 
 class TestEmailValidation:
@@ -66,23 +87,20 @@ class TestEmailValidation:
     def test_invalid_email_no_at(self):
         """Test that emails without @ are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='Invalid email format'):
             auth.validate_email('userexample.com')
-        assert 'Invalid email format' in str(exc_info.value.message)
     
     def test_invalid_email_no_domain(self):
         """Test that emails without domain are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='Invalid email format'):
             auth.validate_email('user@')
-        assert 'Invalid email format' in str(exc_info.value.message)
     
     def test_invalid_email_no_tld(self):
         """Test that emails without TLD are rejected."""
         auth = AuthService()
-        with pytest.raises(ValidationError) as exc_info:
+        with pytest.raises(ValidationError, match='Invalid email format'):
             auth.validate_email('user@domain')
-        assert 'Invalid email format' in str(exc_info.value.message)
 
 
 class TestAuthServiceMocked:
@@ -123,7 +141,7 @@ class TestAuthServiceMocked:
         
         with pytest.raises(AuthorizationError) as exc_info:
             auth_service.register('existing@example.com', 'SecurePass123!')
-        assert 'already exists' in str(exc_info.value.message)
+        assert exc_info.value.details['code'] == 'UsernameExistsException'
     
     def test_login_success(self, auth_service):
         """Test successful login."""
@@ -152,7 +170,7 @@ class TestAuthServiceMocked:
         
         with pytest.raises(AuthorizationError) as exc_info:
             auth_service.login('user@example.com', 'WrongPassword')
-        assert 'Invalid credentials' in str(exc_info.value.message)
+        assert exc_info.value.details['code'] == 'NotAuthorizedException'
     
     def test_verify_token_success(self, auth_service):
         """Test successful token verification."""
@@ -179,4 +197,4 @@ class TestAuthServiceMocked:
         
         with pytest.raises(AuthorizationError) as exc_info:
             auth_service.verify_token('invalid-token')
-        assert 'Invalid or expired token' in str(exc_info.value.message)
+        assert exc_info.value.details['code'] == 'NotAuthorizedException'
@@ -2,61 +2,54 @@
 import pytest
 import json
 from datetime import datetime, UTC
+from unittest.mock import Mock
 from categorization.categorization_service import CategorizationService
 from common.models import Transaction, CATEGORIES
 
 
+_NOW = datetime.now(UTC)
+
+
+def _tx(tx_id, description, amount, date=_NOW):
+    """Build a test transaction (positional args skip the kwargs dict)."""
+    return Transaction(tx_id, 'user-123', date, description, amount,
+                       'test.csv', '{}', createdAt=_NOW)
+
+
+def _bedrock_response(payload):
+    """Build a Bedrock invoke_model response whose body only exposes read()."""
+    body = Mock(spec=['read'])
+    body.read.return_value = payload
+    return {'body': body}
+
+
 class TestPromptBuilding:
     """Test categorization prompt building."""
     
-    def test_build_prompt_single_transaction(self):
+    @pytest.fixture(scope="class")
+    def builder(self):
+        """Create CategorizationService without AWS clients (prompt building only)."""
+        return CategorizationService.__new__(CategorizationService)
+    
+    def test_build_prompt_single_transaction(self, builder):
         """Test prompt building for single transaction."""
-        service = CategorizationService()
-        transaction = Transaction(
-            id='tx-1',
-            userId='user-123',
-            date=datetime(2024, 2, 20),
-            description='Starbucks Coffee',
-            amount=-5.50,
-            sourceFile='test.csv',
-            rawData='{}',
-            createdAt=datetime.now(UTC)
-        )
+        transaction = _tx('tx-1', 'Starbucks Coffee', -5.50, datetime(2024, 2, 20))
         
-        prompt = service._build_categorization_prompt([transaction])
+        prompt = builder._build_categorization_prompt([transaction])
         
         assert 'Starbucks Coffee' in prompt
         assert '$5.50' in prompt
         assert 'expense' in prompt
         assert all(cat in prompt for cat in CATEGORIES)
     
-    def test_build_prompt_multiple_transactions(self):
+    def test_build_prompt_multiple_transactions(self, builder):
         """Test prompt building for multiple transactions."""
-        service = CategorizationService()
         transactions = [
-            Transaction(
-                id='tx-1',
-                userId='user-123',
-                date=datetime(2024, 2, 20),
-                description='Coffee Shop',
-                amount=-5.50,
-                sourceFile='test.csv',
-                rawData='{}',
-                createdAt=datetime.now(UTC)
-            ),
-            Transaction(
-                id='tx-2',
-                userId='user-123',
-                date=datetime(2024, 2, 21),
-                description='Salary Deposit',
-                amount=2000.00,
-                sourceFile='test.csv',
-                rawData='{}',
-                createdAt=datetime.now(UTC)
-            )
+            _tx('tx-1', 'Coffee Shop', -5.50, datetime(2024, 2, 20)),
+            _tx('tx-2', 'Salary Deposit', 2000.00, datetime(2024, 2, 21))
         ]
         
-        prompt = service._build_categorization_prompt(transactions)
+        prompt = builder._build_categorization_prompt(transactions)
         
         assert 'Coffee Shop' in prompt
         assert 'Salary Deposit' in prompt
@@ -67,33 +60,32 @@ class TestPromptBuilding:
 class TestResponseParsing:
     """Test parsing of Bedrock responses."""
     
-    def test_parse_valid_json_response(self):
+    @pytest.fixture(scope="class")
+    def parser(self):
+        """Create CategorizationService without AWS clients (parsing only)."""
+        return CategorizationService.__new__(CategorizationService)
+    
+    def test_parse_valid_json_response(self, parser):
         """Test parsing valid JSON response."""
-        service = CategorizationService()
-        response_text = json.dumps([
-            {"category": "Dining", "confidence": 0.95, "reasoning": "Coffee shop purchase"},
-            {"category": "Income", "confidence": 0.98, "reasoning": "Salary deposit"}
-        ])
+        response_text = (
+            '[{"category": "Dining", "confidence": 0.95, "reasoning": "Coffee shop purchase"}, '
+            '{"category": "Income", "confidence": 0.98, "reasoning": "Salary deposit"}]'
+        )
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Coffee', amount=-5.50, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC)),
-            Transaction(id='tx-2', userId='user-123', date=datetime.now(UTC), 
-                       description='Salary', amount=2000.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Coffee', -5.50),
+            _tx('tx-2', 'Salary', 2000.00)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         assert len(results) == 2
         assert results[0]['category'] == 'Dining'
         assert results[0]['confidence'] == 0.95
         assert results[1]['category'] == 'Income'
     
-    def test_parse_response_with_markdown(self):
+    def test_parse_response_with_markdown(self, parser):
         """Test parsing response wrapped in markdown code blocks."""
-        service = CategorizationService()
         response_text = """```json
 [
     {"category": "Dining", "confidence": 0.95, "reasoning": "Coffee shop"}
@@ -101,87 +93,65 @@ class TestResponseParsing:
 ```"""
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Coffee', amount=-5.50, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Coffee', -5.50)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         assert len(results) == 1
         assert results[0]['category'] == 'Dining'
     
-    def test_parse_response_invalid_category(self):
+    def test_parse_response_invalid_category(self, parser):
         """Test that invalid categories default to Other."""
-        service = CategorizationService()
-        response_text = json.dumps([
-            {"category": "InvalidCategory", "confidence": 0.95, "reasoning": "Test"}
-        ])
+        response_text = '[{"category": "InvalidCategory", "confidence": 0.95, "reasoning": "Test"}]'
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Test', amount=-10.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Test', -10.00)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         assert results[0]['category'] == 'Other'
         assert results[0]['confidence'] == 0.0
     
-    def test_parse_response_low_confidence(self):
+    def test_parse_response_low_confidence(self, parser):
         """Test that low confidence results default to Other."""
-        service = CategorizationService()
-        response_text = json.dumps([
-            {"category": "Dining", "confidence": 0.5, "reasoning": "Uncertain"}
-        ])
+        response_text = '[{"category": "Dining", "confidence": 0.5, "reasoning": "Uncertain"}]'
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Test', amount=-10.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Test', -10.00)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         # Confidence 0.5 is below threshold (0.7), should become Other
         assert results[0]['category'] == 'Other'
     
-    def test_parse_response_malformed_json(self):
+    def test_parse_response_malformed_json(self, parser):
         """Test handling of malformed JSON."""
-        service = CategorizationService()
         response_text = "This is not valid JSON"
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Test', amount=-10.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Test', -10.00)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         # Should fallback to Other
         assert len(results) == 1
         assert results[0]['category'] == 'Other'
         assert results[0]['confidence'] == 0.0
     
-    def test_parse_response_missing_results(self):
+    def test_parse_response_missing_results(self, parser):
         """Test handling when response has fewer results than transactions."""
-        service = CategorizationService()
-        response_text = json.dumps([
-            {"category": "Dining", "confidence": 0.95, "reasoning": "Coffee"}
-        ])
+        response_text = '[{"category": "Dining", "confidence": 0.95, "reasoning": "Coffee"}]'
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Coffee', amount=-5.50, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC)),
-            Transaction(id='tx-2', userId='user-123', date=datetime.now(UTC), 
-                       description='Lunch', amount=-15.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Coffee', -5.50),
+            _tx('tx-2', 'Lunch', -15.00)
         ]
         
-        results = service._parse_categorization_response(response_text, transactions)
+        results = parser._parse_categorization_response(response_text, transactions)
         
         # Should pad with Other category
         assert len(results) == 2
@@ -201,30 +171,21 @@ class TestCategorizationServiceMocked:
         service.transactions_table = mocker.Mock()
         return service
     
-    def test_categorize_batch_success(self, categorization_service, mocker):
+    def test_categorize_batch_success(self, categorization_service):
         """Test successful batch categorization."""
         # Mock Bedrock response
-        mock_response = {
-            'body': mocker.Mock()
-        }
-        mock_response['body'].read.return_value = json.dumps({
+        categorization_service.bedrock.invoke_model.return_value = _bedrock_response(json.dumps({
             'content': [{
                 'text': json.dumps([
                     {"category": "Dining", "confidence": 0.95, "reasoning": "Coffee shop"},
                     {"category": "Transportation", "confidence": 0.90, "reasoning": "Gas station"}
                 ])
             }]
-        }).encode()
-        
-        categorization_service.bedrock.invoke_model.return_value = mock_response
+        }).encode())
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Starbucks', amount=-5.50, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC)),
-            Transaction(id='tx-2', userId='user-123', date=datetime.now(UTC), 
-                       description='Shell Gas', amount=-40.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Starbucks', -5.50),
+            _tx('tx-2', 'Shell Gas', -40.00)
         ]
         
         results = categorization_service.categorize_batch(transactions)
@@ -239,9 +200,7 @@ class TestCategorizationServiceMocked:
         categorization_service.bedrock.invoke_model.side_effect = Exception('Bedrock error')
         
         transactions = [
-            Transaction(id='tx-1', userId='user-123', date=datetime.now(UTC), 
-                       description='Test', amount=-10.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
+            _tx('tx-1', 'Test', -10.00)
         ]
         
         results = categorization_service.categorize_batch(transactions)
@@ -256,25 +215,21 @@ class TestCategorizationServiceMocked:
         results = categorization_service.categorize_batch([])
         assert results == []
     
-    def test_categorize_large_batch(self, categorization_service, mocker):
+    def test_categorize_large_batch(self, categorization_service):
         """Test that large batches are split correctly."""
         # Create 60 transactions (should be split into 2 batches of 50)
-        transactions = [
-            Transaction(id=f'tx-{i}', userId='user-123', date=datetime.now(UTC), 
-                       description=f'Transaction {i}', amount=-10.00, sourceFile='test.csv', 
-                       rawData='{}', createdAt=datetime.now(UTC))
-            for i in range(60)
-        ]
+        transactions = [_tx(f'tx-{i}', f'Transaction {i}', -10.00) for i in range(60)]
         
         # Mock Bedrock to return appropriate number of results
+        response = _bedrock_response(b'')
+        
         def mock_invoke(modelId, body):
-            body_dict = json.loads(body)
-            prompt = body_dict['messages'][0]['content']
-            # Count transactions in prompt
-            count = prompt.count('Description:')
+            # Count transactions in prompt; 'Description:' only occurs in the
+            # prompt field, so scan the raw body instead of decoding it
+            raw = body if isinstance(body, (bytes, bytearray)) else body.encode()
+            count = raw.count(b'Description:')
             
-            mock_response = mocker.Mock()
-            mock_response.read.return_value = json.dumps({
+            response['body'].read.return_value = json.dumps({
                 'content': [{
                     'text': json.dumps([
                         {"category": "Other", "confidence": 0.5, "reasoning": "Test"}
@@ -283,7 +238,7 @@ class TestCategorizationServiceMocked:
                 }]
             }).encode()
             
-            return {'body': mock_response}
+            return response
         
         categorization_service.bedrock.invoke_model.side_effect = mock_invoke
         
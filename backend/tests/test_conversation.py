@@ -3,103 +3,149 @@ Tests for Conversation Service
 """
 
 import json
+import orjson
 import pytest
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
-from moto import mock_aws
-import boto3
-from unittest.mock import patch, MagicMock
+from types import MappingProxyType
+from unittest.mock import patch
+from freezegun import freeze_time
 
 from conversation.conversation_service import ConversationService
 from conversation.ask_question import lambda_handler
-from common.config import Config
 from common.errors import ValidationError
 
 
-@pytest.fixture
-def conversation_service():
-    """Create conversation service instance."""
-    with mock_aws():
-        # Create DynamoDB tables
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        
-        # Transactions table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Conversations table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_CONVERSATIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        yield ConversationService()
+# Fixed "now" for this module; sample data sits inside its last-30-days window
+FROZEN_NOW = datetime(2024, 6, 15, tzinfo=UTC)
+
+# Sample transaction amounts (Decimal is immutable, so one instance each)
+_DINING_AMT = Decimal('-50.00')
+_TRANS_AMT = Decimal('-40.00')
+
+# Bedrock response bodies, encoded once
+_BEDROCK_OK = orjson.dumps({'content': [{
+    'text': 'You spent $500 on dining in the last 30 days, which represents 10 transactions averaging $50 each.'
+}]})
+_BEDROCK_HISTORY = orjson.dumps({'content': [{
+    'text': 'Based on our previous conversation, your dining spending is higher than usual.'
+}]})
+_BEDROCK_SHORT = orjson.dumps({'content': [{'text': 'You spent $500 on dining.'}]})
+
+# Lambda events (the handler only reads them, so tests can share one instance)
+_AUTHORIZED = {'authorizer': {'claims': {'sub': 'test-user'}}}
+_EVENT_ASK = {
+    'requestContext': _AUTHORIZED,
+    'body': json.dumps({'question': 'How much did I spend on dining?'})
+}
+_EVENT_UNAUTH = {'requestContext': {}, 'body': json.dumps({'question': 'Test'})}
+_EVENT_NO_QUESTION = {'requestContext': _AUTHORIZED, 'body': json.dumps({})}
+
+
+class _FakeBody:
+    """Streaming body stand-in exposing only read()."""
+    __slots__ = ('_body',)
+    
+    def __init__(self, body):
+        self._body = body
+    
+    def read(self):
+        return self._body
+
+
+class _FakeBedrock:
+    """Minimal Bedrock runtime client; records invoke_model calls."""
+    
+    def __init__(self, body=b'', error=None):
+        self._body = body
+        self._error = error
+        self.calls = []
+    
+    def invoke_model(self, **kwargs):
+        self.calls.append(kwargs)
+        if self._error is not None:
+            raise self._error
+        return {'body': _FakeBody(self._body)}
 
 
 @pytest.fixture
-def sample_transactions():
-    """Create sample transaction data."""
-    transactions = []
-    base_date = datetime.now(UTC) - timedelta(days=20)
+def conversation_service(aws_resources):
+    """Create conversation service instance against the shared mocked backend."""
+    return ConversationService()
+
+
+def _sample_transaction(txn_date, txn_id, description, amount, category):
+    """Build one sample transaction item."""
+    return {
+        'PK': 'USER#test-user',
+        'SK': f'TRANSACTION#{txn_date}#{txn_id}',
+        'userId': 'test-user',
+        'date': txn_date,
+        'description': description,
+        'amount': amount,
+        'category': category,
+        'id': txn_id
+    }
+
+
+def _build_sample_transactions():
+    """Build the read-only sample transaction set shared by the module."""
+    base_date = FROZEN_NOW - timedelta(days=20)
     
     # Dining transactions
-    for i in range(10):
-        txn_date = (base_date + timedelta(days=i * 2)).isoformat()
-        txn_id = f'dining-{i}'
-        transactions.append({
-            'PK': f'USER#test-user',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
-            'userId': 'test-user',
-            'date': txn_date,
-            'description': f'Restaurant {i}',
-            'amount': Decimal('-50.00'),
-            'category': 'Dining',
-            'id': txn_id
-        })
+    dining = [
+        _sample_transaction((base_date + timedelta(days=i * 2)).isoformat(), f'dining-{i}',
+                            f'Restaurant {i}', _DINING_AMT, 'Dining')
+        for i in range(10)
+    ]
     
     # Transportation
-    for i in range(5):
-        txn_date = (base_date + timedelta(days=i * 3)).isoformat()
-        txn_id = f'transport-{i}'
-        transactions.append({
-            'PK': f'USER#test-user',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
-            'userId': 'test-user',
-            'date': txn_date,
-            'description': 'Gas Station',
-            'amount': Decimal('-40.00'),
-            'category': 'Transportation',
-            'id': txn_id
-        })
+    transport = [
+        _sample_transaction((base_date + timedelta(days=i * 3)).isoformat(), f'transport-{i}',
+                            'Gas Station', _TRANS_AMT, 'Transportation')
+        for i in range(5)
+    ]
     
-    return transactions
+    return tuple(MappingProxyType(txn) for txn in dining + transport)
+
+
+_SAMPLE_TRANSACTIONS = _build_sample_transactions()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def frozen_time():
+    """Freeze the clock so time-range detection and sample dates are deterministic."""
+    with freeze_time(FROZEN_NOW):
+        yield
+
 
+@pytest.fixture(scope="module")
+def sample_transactions():
+    """Sample transaction data (immutable, shared across the module)."""
+    return _SAMPLE_TRANSACTIONS
+
+
+def insert_transactions(table, transactions):
+    """Write transactions through one batch writer (25 items per request)."""
+    with table.batch_writer() as batch:
+        for txn in transactions:
+            batch.put_item(Item=dict(txn))
 
-def test_detect_time_range_this_month(conversation_service):
-    """Test time range detection for 'this month'."""
-    result = conversation_service._detect_time_range("How much did I spend this month?")
+
+@pytest.mark.parametrize('question, description, check', [
+    ("How much did I spend this month?", 'this month',
+     lambda r: r['start'].day == 1 and r['start'].month == FROZEN_NOW.month),
+    ("Show me this week's expenses", 'this week',
+     lambda r: (r['end'] - r['start']).days <= 7),
+    ("What did I spend on dining?", 'last 30 days',
+     lambda r: 29 <= (r['end'] - r['start']).days <= 31),
+], ids=['this_month', 'this_week', 'default'])
+def test_detect_time_range(conversation_service, question, description, check):
+    """Test time range detection for common question phrasings."""
+    result = conversation_service._detect_time_range(question)
     
-    assert result['description'] == 'this month'
-    assert result['start'].day == 1
-    assert result['start'].month == datetime.now(UTC).month
+    assert result['description'] == description
+    assert check(result)
 
 
 def test_detect_time_range_last_month(conversation_service):
@@ -112,31 +158,10 @@ def test_detect_time_range_last_month(conversation_service):
     assert result['start'] < datetime.now(UTC)
 
 
-def test_detect_time_range_this_week(conversation_service):
-    """Test time range detection for 'this week'."""
-    result = conversation_service._detect_time_range("Show me this week's expenses")
-    
-    assert result['description'] == 'this week'
-    # Should be within last 7 days
-    days_diff = (result['end'] - result['start']).days
-    assert days_diff <= 7
-
-
-def test_detect_time_range_default(conversation_service):
-    """Test default time range (last 30 days)."""
-    result = conversation_service._detect_time_range("What did I spend on dining?")
-    
-    assert result['description'] == 'last 30 days'
-    days_diff = (result['end'] - result['start']).days
-    assert days_diff >= 29 and days_diff <= 31
-
-
 def test_get_relevant_context(conversation_service, sample_transactions):
     """Test retrieving relevant financial context."""
     # Insert transactions
-    table = conversation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(conversation_service.transactions_table, sample_transactions)
     
     context = conversation_service.get_relevant_context(
         'test-user',
@@ -241,26 +266,13 @@ def test_build_context_summary(conversation_service):
     assert 'Transportation' in summary
 
 
-@patch('src.conversation.conversation_service.boto3.client')
-def test_ask_question_success(mock_boto_client, conversation_service, sample_transactions):
+def test_ask_question_success(conversation_service, sample_transactions):
     """Test asking a question successfully."""
     # Mock Bedrock response
-    mock_bedrock = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': 'You spent $500 on dining in the last 30 days, which represents 10 transactions averaging $50 each.'
-        }]
-    }).encode()
-    mock_bedrock.invoke_model.return_value = mock_response
-    mock_boto_client.return_value = mock_bedrock
+    fake = conversation_service.bedrock = _FakeBedrock(_BEDROCK_OK)
     
     # Insert transactions
-    table = conversation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(conversation_service.transactions_table, sample_transactions)
     
     # Ask question
     response = conversation_service.ask_question(
@@ -272,8 +284,8 @@ def test_ask_question_success(mock_boto_client, conversation_service, sample_tra
     assert 'confidence' in response
     assert 'sources' in response
     assert 'context' in response
-    # Response should have an answer (even if fallback)
-    assert len(response['answer']) > 0
+    assert len(fake.calls) == 1
+    assert response['answer'] == orjson.loads(_BEDROCK_OK)['content'][0]['text']
 
 
 def test_ask_question_empty(conversation_service):
@@ -288,26 +300,13 @@ def test_ask_question_whitespace_only(conversation_service):
         conversation_service.ask_question('test-user', "   ")
 
 
-@patch('src.conversation.conversation_service.boto3.client')
-def test_ask_question_with_history(mock_boto_client, conversation_service, sample_transactions):
+def test_ask_question_with_history(conversation_service, sample_transactions):
     """Test asking a question with conversation history."""
     # Mock Bedrock
-    mock_bedrock = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': 'Based on our previous conversation, your dining spending is higher than usual.'
-        }]
-    }).encode()
-    mock_bedrock.invoke_model.return_value = mock_response
-    mock_boto_client.return_value = mock_bedrock
+    fake = conversation_service.bedrock = _FakeBedrock(_BEDROCK_HISTORY)
     
     # Insert transactions
-    table = conversation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(conversation_service.transactions_table, sample_transactions)
     
     # Conversation history
     history = [
@@ -322,20 +321,20 @@ def test_ask_question_with_history(mock_boto_client, conversation_service, sampl
     )
     
     assert 'answer' in response
+    assert len(fake.calls) == 1
+    # History is replayed ahead of the new question
+    messages = orjson.loads(fake.calls[0]['body'])['messages']
+    assert messages[:2] == history
+    assert 'Is that more than usual?' in messages[2]['content']
 
 
-@patch('src.conversation.conversation_service.boto3.client')
-def test_ask_question_bedrock_failure(mock_boto_client, conversation_service, sample_transactions):
+def test_ask_question_bedrock_failure(conversation_service, sample_transactions):
     """Test fallback when Bedrock fails."""
     # Mock Bedrock failure
-    mock_bedrock = MagicMock()
-    mock_bedrock.invoke_model.side_effect = Exception("Bedrock error")
-    mock_boto_client.return_value = mock_bedrock
+    fake = conversation_service.bedrock = _FakeBedrock(error=Exception("Bedrock error"))
     
     # Insert transactions
-    table = conversation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(conversation_service.transactions_table, sample_transactions)
     
     response = conversation_service.ask_question(
         'test-user',
@@ -343,78 +342,39 @@ def test_ask_question_bedrock_failure(mock_boto_client, conversation_service, sa
     )
     
     # Should return fallback response
+    assert len(fake.calls) == 1
     assert 'answer' in response
     assert response['confidence'] == 0.0
     assert 'trouble' in response['answer'].lower() or 'try' in response['answer'].lower()
 
 
-@patch('src.conversation.conversation_service.boto3.client')
-def test_lambda_handler(mock_boto_client, conversation_service, sample_transactions):
+def test_lambda_handler(conversation_service, sample_transactions):
     """Test conversation Lambda handler."""
-    # Mock Bedrock
-    mock_bedrock = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': 'You spent $500 on dining.'
-        }]
-    }).encode()
-    mock_bedrock.invoke_model.return_value = mock_response
-    mock_boto_client.return_value = mock_bedrock
+    # The handler builds its own service, so its Bedrock client comes from boto3.client
+    fake = _FakeBedrock(_BEDROCK_SHORT)
     
     # Insert transactions
-    table = conversation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
-    
-    event = {
-        'requestContext': {
-            'authorizer': {
-                'claims': {
-                    'sub': 'test-user'
-                }
-            }
-        },
-        'body': json.dumps({
-            'question': 'How much did I spend on dining?'
-        })
-    }
+    insert_transactions(conversation_service.transactions_table, sample_transactions)
     
-    response = lambda_handler(event, None)
+    with patch('conversation.conversation_service.boto3.client', return_value=fake):
+        response = lambda_handler(_EVENT_ASK, None)
     
     assert response['statusCode'] == 200
-    body = json.loads(response['body'])
-    assert 'answer' in body
+    assert len(fake.calls) == 1
+    body = orjson.loads(response['body'])
+    assert body['answer'] == 'You spent $500 on dining.'
     assert 'confidence' in body
 
 
 def test_lambda_handler_unauthorized():
     """Test Lambda handler without authorization."""
-    event = {
-        'requestContext': {},
-        'body': json.dumps({'question': 'Test'})
-    }
-    
-    response = lambda_handler(event, None)
+    response = lambda_handler(_EVENT_UNAUTH, None)
     
     assert response['statusCode'] == 401
 
 
 def test_lambda_handler_missing_question():
     """Test Lambda handler without question."""
-    event = {
-        'requestContext': {
-            'authorizer': {
-                'claims': {
-                    'sub': 'test-user'
-                }
-            }
-        },
-        'body': json.dumps({})
-    }
-    
-    response = lambda_handler(event, None)
+    response = lambda_handler(_EVENT_NO_QUESTION, None)
     
     assert response['statusCode'] == 400
@@ -4,125 +4,90 @@ Unit tests for Account Deletion Service.
 
 import pytest
 import json
+import orjson
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
-from moto import mock_aws
-import boto3
 
 from auth.deletion_service import DeletionService
 from auth.delete_account import lambda_handler
 from common.errors import ValidationError, NotFoundError
 from common.config import Config
+from tests.conftest import bulk_put
 
 
 @pytest.fixture
-def deletion_service():
-    """Create DeletionService instance with mocked AWS services."""
-    with mock_aws():
-        # Create DynamoDB tables
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        
-        # Users table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_USERS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Transactions table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Reports table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_REPORTS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Conversations table
-        dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_CONVERSATIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Create S3 bucket
-        s3 = boto3.client('s3', region_name='us-east-1')
-        s3.create_bucket(Bucket=Config.S3_BUCKET)
-        
-        yield DeletionService()
+def deletion_service(aws_resources):
+    """Create DeletionService instance against the shared mocked AWS backend."""
+    return DeletionService()
+
+
+# Transaction dates and amounts seeded by create_test_data
+_TXN_DATES = tuple(f"2024-01-{i+1:02d}" for i in range(5))
+_TXN_AMOUNTS = tuple(Decimal(f"-{50 * (i + 1)}.00") for i in range(5))
+
+# Lambda events (the handler only reads them, so tests can share one instance)
+_AUTHORIZED = {'authorizer': {'claims': {'sub': 'user123'}}}
+_EVENT_DATA_SUMMARY = {'requestContext': _AUTHORIZED, 'path': '/account/data', 'httpMethod': 'GET'}
+_EVENT_UNAUTH = {'requestContext': {}, 'path': '/account/delete', 'httpMethod': 'POST'}
+_EVENT_BAD_PATH = {'requestContext': _AUTHORIZED, 'path': '/account/invalid', 'httpMethod': 'GET'}
 
 
 def create_test_data(service, user_id):
-    """Helper to create test data for a user."""
+    """
+    Helper to create test data for a user.
+    
+    Returns:
+        Keys of the DynamoDB items written, grouped by table name
+    """
+    pk = f'USER#{user_id}'
+    keys = {
+        service.transactions_table.name: [],
+        service.reports_table.name: [],
+        service.conversations_table.name: []
+    }
+    
     # Add transactions
-    for i in range(5):
-        txn_date = f"2024-01-{i+1:02d}"
-        txn_id = f"txn-{i+1}"
-        service.transactions_table.put_item(Item={
-            'PK': f'USER#{user_id}',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
+    transactions = [
+        {
+            'PK': pk,
+            'SK': f'TRANSACTION#{txn_date}#txn-{i+1}',
             'userId': user_id,
             'date': txn_date,
-            'amount': Decimal(str(-50.00 * (i + 1))),
+            'amount': amount,
             'description': f'Transaction {i+1}',
             'category': 'Dining',
-            'id': txn_id
-        })
+            'id': f'txn-{i+1}'
+        }
+        for i, (txn_date, amount) in enumerate(zip(_TXN_DATES, _TXN_AMOUNTS))
+    ]
+    bulk_put(service.transactions_table, transactions)
+    keys[service.transactions_table.name] = [{'PK': t['PK'], 'SK': t['SK']} for t in transactions]
     
     # Add reports
-    for month in ['2024-01', '2024-02']:
-        service.reports_table.put_item(Item={
-            'PK': f'USER#{user_id}',
-            'SK': f'REPORT#{month}',
-            'userId': user_id,
-            'month': month,
-            'reportData': json.dumps({'totalSpending': 500.0})
-        })
+    with service.reports_table.batch_writer() as batch:
+        for month in ['2024-01', '2024-02']:
+            keys[service.reports_table.name].append({'PK': pk, 'SK': f'REPORT#{month}'})
+            batch.put_item(Item={
+                'PK': f'USER#{user_id}',
+                'SK': f'REPORT#{month}',
+                'userId': user_id,
+                'month': month,
+                'reportData': json.dumps({'totalSpending': 500.0})
+            })
     
     # Add conversations
-    for i in range(3):
-        timestamp = f"2024-01-01T12:00:{i:02d}"
-        service.conversations_table.put_item(Item={
-            'PK': f'USER#{user_id}',
-            'SK': f'CONVERSATION#{timestamp}',
-            'userId': user_id,
-            'timestamp': timestamp,
-            'question': f'Question {i+1}',
-            'answer': f'Answer {i+1}'
-        })
+    with service.conversations_table.batch_writer() as batch:
+        for i in range(3):
+            timestamp = f"2024-01-01T12:00:{i:02d}"
+            keys[service.conversations_table.name].append({'PK': pk, 'SK': f'CONVERSATION#{timestamp}'})
+            batch.put_item(Item={
+                'PK': f'USER#{user_id}',
+                'SK': f'CONVERSATION#{timestamp}',
+                'userId': user_id,
+                'timestamp': timestamp,
+                'question': f'Question {i+1}',
+                'answer': f'Answer {i+1}'
+            })
     
     # Add S3 files
     for i in range(2):
@@ -131,12 +96,32 @@ def create_test_data(service, user_id):
             Key=f"users/{user_id}/statement-{i+1}.csv",
             Body=b'test data'
         )
+    
+    return keys
+
+
+def _get_user_raw(client, user_id, attrs):
+    """
+    Read selected attributes of a user profile through the low-level client.
+    
+    Returns:
+        Raw DynamoDB AttributeValues keyed by attribute name, or None if the
+        profile does not exist
+    """
+    names = {f'#a{i}': attr for i, attr in enumerate(attrs)}
+    response = client.get_item(
+        TableName=Config.DYNAMODB_TABLE_USERS,
+        Key={'PK': {'S': f'USER#{user_id}'}, 'SK': {'S': 'PROFILE'}},
+        ProjectionExpression=', '.join(names),
+        ExpressionAttributeNames=names
+    )
+    return response.get('Item')
 
 
 class TestDeletionService:
     """Test DeletionService functionality."""
     
-    def test_request_account_deletion(self, deletion_service):
+    def test_request_account_deletion(self, deletion_service, raw_dynamodb):
         """Test requesting account deletion."""
         user_id = 'user123'
         
@@ -157,12 +142,12 @@ class TestDeletionService:
         })
         
         # Verify user is marked for deletion
-        response = deletion_service.users_table.get_item(Key={'PK': f'USER#{user_id}', 'SK': 'PROFILE'})
-        assert 'Item' in response
-        assert response['Item']['deletionRequested'] is True
-        assert response['Item']['status'] == 'pending_deletion'
+        item = _get_user_raw(raw_dynamodb, user_id, ('deletionRequested', 'status'))
+        assert item is not None
+        assert item['deletionRequested'] == {'BOOL': True}
+        assert item['status'] == {'S': 'pending_deletion'}
     
-    def test_cancel_account_deletion(self, deletion_service):
+    def test_cancel_account_deletion(self, deletion_service, raw_dynamodb):
         """Test cancelling account deletion."""
         user_id = 'user123'
         
@@ -184,10 +169,10 @@ class TestDeletionService:
         assert result['deletionCancelled'] is True
         
         # Verify deletion flags are removed
-        response = deletion_service.users_table.get_item(Key={'PK': f'USER#{user_id}', 'SK': 'PROFILE'})
-        assert 'Item' in response
-        assert 'deletionRequested' not in response['Item']
-        assert response['Item']['status'] == 'active'
+        item = _get_user_raw(raw_dynamodb, user_id, ('deletionRequested', 'status'))
+        assert item is not None
+        assert 'deletionRequested' not in item
+        assert item['status'] == {'S': 'active'}
     
     def test_cancel_deletion_no_request(self, deletion_service):
         """Test cancelling when no deletion was requested."""
@@ -216,7 +201,7 @@ class TestDeletionService:
         user_id = 'user123'
         
         # Create test data
-        create_test_data(deletion_service, user_id)
+        keys = create_test_data(deletion_service, user_id)
         
         # Execute deletion
         result = deletion_service.execute_account_deletion(user_id)
@@ -227,27 +212,12 @@ class TestDeletionService:
         assert result['conversations'] == 3
         assert result['s3Files'] == 2
         
-        # Verify all data is deleted
-        # Transactions
-        txn_response = deletion_service.transactions_table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': f'USER#{user_id}'}
+        # Verify every seeded item is gone with a single batch read
+        response = deletion_service.dynamodb.batch_get_item(
+            RequestItems={name: {'Keys': table_keys} for name, table_keys in keys.items()}
         )
-        assert len(txn_response.get('Items', [])) == 0
-        
-        # Reports
-        report_response = deletion_service.reports_table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': f'USER#{user_id}'}
-        )
-        assert len(report_response.get('Items', [])) == 0
-        
-        # Conversations
-        conv_response = deletion_service.conversations_table.query(
-            KeyConditionExpression='PK = :pk',
-            ExpressionAttributeValues={':pk': f'USER#{user_id}'}
-        )
-        assert len(conv_response.get('Items', [])) == 0
+        for name in keys:
+            assert response['Responses'].get(name, []) == []
         
         # S3 files
         s3_response = deletion_service.s3.list_objects_v2(
@@ -256,12 +226,21 @@ class TestDeletionService:
         )
         assert 'Contents' not in s3_response
     
-    def test_execute_deletion_no_data(self, deletion_service):
+    def test_execute_deletion_no_data(self, deletion_service, mocker):
         """Test deletion when user has no data."""
         user_id = 'user123'
+        client = deletion_service.transactions_table.meta.client
+        query_spy = mocker.patch.object(client, 'query', wraps=client.query)
+        scan_spy = mocker.patch.object(client, 'scan', wraps=client.scan)
+        write_spy = mocker.patch.object(client, 'batch_write_item', wraps=client.batch_write_item)
         
         result = deletion_service.execute_account_deletion(user_id)
         
+        # One keys-only query per table, nothing scanned or written
+        assert query_spy.call_count == 3
+        assert scan_spy.call_count == 0
+        assert write_spy.call_count == 0
+        
         assert result['userId'] == user_id
         assert result['transactions'] == 0
         assert result['reports'] == 0
@@ -356,18 +335,18 @@ class TestDeletionService:
         user_id = 'user123'
         
         # Create many transactions (to test pagination)
-        for i in range(10):
-            txn_date = f"2024-01-{i+1:02d}T12:00:00"
-            txn_id = f"txn-{i+1}"
-            deletion_service.transactions_table.put_item(Item={
-                'PK': f'USER#user123',
-                'SK': f'TRANSACTION#{txn_date}#{txn_id}',
+        bulk_put(deletion_service.transactions_table, [
+            {
+                'PK': f'USER#{user_id}',
+                'SK': f'TRANSACTION#2024-01-{i+1:02d}T12:00:00#txn-{i+1}',
                 'userId': user_id,
-                'date': txn_date,
+                'date': f"2024-01-{i+1:02d}T12:00:00",
                 'amount': Decimal('-50.00'),
                 'description': f'Transaction {i+1}',
-                'id': txn_id
-            })
+                'id': f"txn-{i+1}"
+            }
+            for i in range(10)
+        ])
         
         items = deletion_service._get_all_user_items(
             deletion_service.transactions_table,
@@ -380,109 +359,28 @@ class TestDeletionService:
 class TestDeleteAccountLambda:
     """Test delete_account Lambda function."""
     
-    def test_lambda_get_data_summary(self):
+    def test_lambda_get_data_summary(self, deletion_service):
         """Test getting data summary via Lambda."""
-        with mock_aws():
-            # Setup
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_USERS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_REPORTS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_CONVERSATIONS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            s3 = boto3.client('s3', region_name='us-east-1')
-            s3.create_bucket(Bucket=Config.S3_BUCKET)
-            
-            event = {
-                'requestContext': {
-                    'authorizer': {
-                        'claims': {
-                            'sub': 'user123'
-                        }
-                    }
-                },
-                'path': '/account/data',
-                'httpMethod': 'GET'
-            }
-            
-            response = lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            assert body['userId'] == 'user123'
-            assert 'dataCategories' in body
+        create_test_data(deletion_service, 'user123')
+        
+        response = lambda_handler(_EVENT_DATA_SUMMARY, None)
+        
+        assert response['statusCode'] == 200
+        body = orjson.loads(response['body'])
+        assert body['userId'] == 'user123'
+        assert 'dataCategories' in body
+        assert body['dataCategories']['transactions']['count'] == 5
     
     def test_lambda_unauthorized(self):
         """Test Lambda without authorization."""
-        event = {
-            'requestContext': {},
-            'path': '/account/delete',
-            'httpMethod': 'POST'
-        }
-        
-        response = lambda_handler(event, None)
+        response = lambda_handler(_EVENT_UNAUTH, None)
         
         assert response['statusCode'] == 401
-        body = json.loads(response['body'])
+        body = orjson.loads(response['body'])
         assert 'Unauthorized' in body['error']
     
     def test_lambda_not_found(self):
         """Test Lambda with invalid path."""
-        event = {
-            'requestContext': {
-                'authorizer': {
-                    'claims': {
-                        'sub': 'user123'
-                    }
-                }
-            },
-            'path': '/account/invalid',
-            'httpMethod': 'GET'
-        }
-        
-        response = lambda_handler(event, None)
+        response = lambda_handler(_EVENT_BAD_PATH, None)
         
         assert response['statusCode'] == 404
@@ -3,13 +3,10 @@
 Tests complete user workflows from upload through analysis and reporting.
 Requirements: 1.1, 2.1, 3.1, 4.1, 6.1, 7.1, 8.1, 9.1
 """
+import math
 import pytest
-import boto3
-from moto import mock_aws
 from datetime import datetime, timedelta, UTC
 import json
-import io
-import csv
 from decimal import Decimal
 
 from auth.auth_service import AuthService
@@ -21,85 +18,122 @@ from prediction.prediction_service import PredictionService
 from recommendation.recommendation_service import RecommendationService
 from conversation.conversation_service import ConversationService
 from report.report_service import ReportService
+from common.models import Transaction
+from tests.conftest import (
+    bulk_put, clear_tables, clear_bucket, delete_tables, delete_bucket, shared_dynamodb_resource
+)
+
+E2E_TABLES = ('n3xfin-users', 'n3xfin-transactions', 'n3xfin-reports')
+E2E_BUCKET = 'n3xfin-data-test'
+
+# Seed amounts and confidence (Decimal parses its string once per constant)
+_CONFIDENCE = Decimal('0.9')
+_AMT_COFFEE = Decimal('-5.00')
+_AMT_RESTAURANT = Decimal('-50.00')
+_AMT_COFFEE_SHOP = Decimal('-5.50')
+_AMT_SHOPPING = Decimal('-25.00')
+_AMT_SMALL = Decimal('-10.00')
+
+# Keyword -> category rules standing in for Bedrock categorization
+_CATEGORY_RULES = (
+    ('coffee', 'Dining'),
+    ('uber', 'Transportation'),
+    ('netflix', 'Entertainment'),
+    ('salary', 'Income'),
+)
+
+
+@pytest.fixture(scope="module")
+def setup_aws_resources(aws_mock, aws_session):
+    """
+    Set up all required AWS resources for E2E tests.
+    
+    Module-scoped: tables and bucket are created once per module (and per
+    xdist worker); every test seeds data under its own user_id.
+    """
+    # Create DynamoDB tables
+    dynamodb = aws_session.client('dynamodb')
+    
+    # Users table
+    dynamodb.create_table(
+        TableName='n3xfin-users',
+        KeySchema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    
+    # Transactions table
+    dynamodb.create_table(
+        TableName='n3xfin-transactions',
+        KeySchema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'},
+            {'AttributeName': 'GSI1PK', 'AttributeType': 'S'},
+            {'AttributeName': 'GSI1SK', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': 'CategoryIndex',
+                'KeySchema': [
+                    {'AttributeName': 'GSI1PK', 'KeyType': 'HASH'},
+                    {'AttributeName': 'GSI1SK', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    
+    # Reports table
+    dynamodb.create_table(
+        TableName='n3xfin-reports',
+        KeySchema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    
+    # Create S3 bucket
+    s3 = aws_session.client('s3')
+    s3.create_bucket(Bucket=E2E_BUCKET)
+    
+    yield {
+        'dynamodb': dynamodb,
+        's3': s3,
+        'transactions_table': shared_dynamodb_resource().Table('n3xfin-transactions')
+    }
+    
+    # The session-wide mock keeps state, so drop what this module created
+    delete_tables(shared_dynamodb_resource(), E2E_TABLES)
+    delete_bucket(s3, E2E_BUCKET)
 
 
 @pytest.fixture
-def setup_aws_resources(aws_credentials):
-    """Set up all required AWS resources for E2E tests."""
-    with mock_aws():
-        # Create DynamoDB tables
-        dynamodb = boto3.client('dynamodb', region_name='us-east-1')
-        
-        # Users table
-        dynamodb.create_table(
-            TableName='n3xfin-users',
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Transactions table
-        dynamodb.create_table(
-            TableName='n3xfin-transactions',
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'},
-                {'AttributeName': 'GSI1PK', 'AttributeType': 'S'},
-                {'AttributeName': 'GSI1SK', 'AttributeType': 'S'}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'CategoryIndex',
-                    'KeySchema': [
-                        {'AttributeName': 'GSI1PK', 'KeyType': 'HASH'},
-                        {'AttributeName': 'GSI1SK', 'KeyType': 'RANGE'}
-                    ],
-                    'Projection': {'ProjectionType': 'ALL'}
-                }
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Reports table
-        dynamodb.create_table(
-            TableName='n3xfin-reports',
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Create S3 bucket
-        s3 = boto3.client('s3', region_name='us-east-1')
-        s3.create_bucket(Bucket='n3xfin-data-test')
-        
-        yield {
-            'dynamodb': dynamodb,
-            's3': s3
-        }
+def reset_aws_state(setup_aws_resources):
+    """Hand out the module's AWS resources and empty the tables and bucket after each test."""
+    yield setup_aws_resources
+    
+    clear_tables(shared_dynamodb_resource(), E2E_TABLES)
+    clear_bucket(setup_aws_resources['s3'], E2E_BUCKET)
 
 
 def create_sample_csv():
     """Create a sample CSV bank statement."""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Date', 'Description', 'Amount', 'Balance'])
-    
     # Generate 30 days of transactions
     base_date = datetime.now() - timedelta(days=30)
     balance = 5000.0
@@ -117,35 +151,150 @@ def create_sample_csv():
         (base_date + timedelta(days=18), 'Gym Membership', -50.00),
     ]
     
+    # No field needs quoting, so rows are joined directly instead of via csv.writer
+    rows = ['Date,Description,Amount,Balance']
     for date, desc, amount in transactions:
         balance += amount
-        writer.writerow([
-            date.strftime('%Y-%m-%d'),
-            desc,
-            f'{amount:.2f}',
-            f'{balance:.2f}'
-        ])
+        rows.append(f"{date:%Y-%m-%d},{desc},{amount:.2f},{balance:.2f}")
     
-    return output.getvalue()
+    return '\r\n'.join(rows) + '\r\n'
+
+
+# The statement only depends on the date the module was imported, so encode it once
+_SAMPLE_CSV_BYTES = create_sample_csv().encode('utf-8')
+
+
+def _daily_items(user_id, start, count, step=1, **fields):
+    """
+    Build seed transactions `step` days apart from `start`.
+    
+    `fields` (amount, category, ...) are shared by every item; without a
+    `description` each item is named 'Transaction <i>'.
+    """
+    base_item = {
+        'PK': f'USER#{user_id}',
+        'categoryConfidence': _CONFIDENCE,
+        **fields
+    }
+    items = []
+    for i in range(count):
+        iso = (start + timedelta(days=i * step)).isoformat()
+        items.append({
+            'description': f'Transaction {i}',
+            **base_item,
+            'SK': f'TRANSACTION#{iso}#{i}',
+            'id': f'txn-{i}',
+            'date': iso
+        })
+    return items
+
+
+def _last_month():
+    """Last day of the previous month (UTC)."""
+    return datetime.now(UTC).replace(day=1) - timedelta(days=1)
+
+
+def _seed_predictions(user_id):
+    """Consistent daily coffee spending over the last 60 days."""
+    return _daily_items(user_id, datetime.now(UTC) - timedelta(days=60), 60,
+                        description='Daily Coffee', amount=_AMT_COFFEE, category='Dining')
+
+
+def _check_predictions(user_id):
+    """Historical data -> Predictions -> Alerts (Requirements: 6.1)."""
+    prediction_service = PredictionService()
+    
+    predictions = prediction_service.predict_spending(user_id, 'Dining', 30)
+    assert predictions is not None
+    assert 'predictedAmount' in predictions
+    assert 'historicalAverage' in predictions
+    
+    alerts = prediction_service.generate_alerts(user_id)
+    assert isinstance(alerts, list)
+
+
+def _seed_recommendations(user_id):
+    """High dining spending (savings opportunity) over the last 30 days."""
+    return _daily_items(user_id, datetime.now() - timedelta(days=30), 20,
+                        description='Restaurant', amount=_AMT_RESTAURANT, category='Dining')
+
+
+def _check_recommendations(user_id):
+    """Spending analysis -> Personalized recommendations (Requirements: 7.1)."""
+    recommendations = RecommendationService().generate_recommendations(user_id)
+    assert isinstance(recommendations, list)
+    assert len(recommendations) > 0
+    
+    # Verify recommendations are ranked
+    for current, following in zip(recommendations, recommendations[1:]):
+        assert current['priority'] >= following['priority']
+
+
+def _seed_conversation(user_id):
+    """Coffee purchases every third day over the last 30 days."""
+    return _daily_items(user_id, datetime.now() - timedelta(days=30), 10, step=3,
+                        description='Coffee Shop', amount=_AMT_COFFEE_SHOP, category='Dining')
+
+
+def _check_conversation(user_id):
+    """User question -> Context retrieval -> AI response (Requirements: 8.1)."""
+    question = "How much did I spend on dining last month?"
+    context = ConversationService().get_relevant_context(user_id, question)
+    
+    assert context is not None
+    assert 'relevantTransactions' in context or 'categoryTotals' in context
+
+
+def _seed_monthly_report(user_id):
+    """A month of shopping transactions starting on the 1st of last month."""
+    return _daily_items(user_id, _last_month().replace(day=1), 30,
+                        amount=_AMT_SHOPPING, category='Shopping')
+
+
+def _check_monthly_report(user_id):
+    """Monthly data -> Report generation -> Export (Requirements: 9.1)."""
+    report_month = _last_month()
+    report_service = ReportService()
+    
+    report = report_service.generate_monthly_report(user_id, report_month.year, report_month.month)
+    assert report is not None
+    assert 'totalSpending' in report
+    assert 'spendingByCategory' in report
+    assert 'month' in report
+    
+    csv_export = report_service.export_to_csv(report)
+    assert csv_export is not None
+    assert len(csv_export) > 0
+
+
+# Workflows that seed transaction history and then exercise one service.
+# They share one test body (seed -> check) but keep a test id each, so -k and
+# xdist still address them individually; a workflow needing its own fixtures
+# or steps (upload -> dashboard) is cheaper to read as a separate method.
+SEEDED_WORKFLOWS = [
+    pytest.param('test-user-002', _seed_predictions, _check_predictions, id='predictions_and_alerts'),
+    pytest.param('test-user-003', _seed_recommendations, _check_recommendations, id='recommendations'),
+    pytest.param('test-user-004', _seed_conversation, _check_conversation, id='conversational_qa'),
+    pytest.param('test-user-005', _seed_monthly_report, _check_monthly_report, id='monthly_report'),
+]
 
 
 @pytest.mark.integration
 class TestCompleteUserWorkflow:
     """Test complete user workflows from registration to reporting."""
     
-    def test_full_workflow_upload_to_dashboard(self, setup_aws_resources):
+    def test_full_workflow_upload_to_dashboard(self, reset_aws_state):
         """
         Test complete workflow: Register -> Upload -> Parse -> Categorize -> View Dashboard
         Requirements: 1.1, 2.1, 3.1, 4.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-001'
         
         # Step 1: Upload CSV file
         upload_service = UploadService()
         
-        csv_content = create_sample_csv()
-        csv_bytes = csv_content.encode('utf-8')
+        csv_bytes = _SAMPLE_CSV_BYTES
         
         # Validate and upload file
         is_valid, file_type, error = upload_service.validate_file('statement.csv', len(csv_bytes))
@@ -170,30 +319,18 @@ class TestCompleteUserWorkflow:
         
         transactions = parser_service.parse_csv(s3_location['bucket'], s3_location['key'], user_id)
         assert len(transactions) > 0
-        assert hasattr(transactions[0], 'date')
-        assert hasattr(transactions[0], 'description')
-        assert hasattr(transactions[0], 'amount')
+        assert isinstance(transactions[0], Transaction)
         
         # Step 3: Categorize transactions (mocked)
         categorization_service = CategorizationService()
         
-        # Mock categorization for testing
+        # Mock categorization for testing (first matching keyword wins)
         for transaction in transactions:
-            if 'coffee' in transaction.description.lower():
-                category = 'Dining'
-            elif 'uber' in transaction.description.lower():
-                category = 'Transportation'
-            elif 'netflix' in transaction.description.lower():
-                category = 'Entertainment'
-            elif 'salary' in transaction.description.lower():
-                category = 'Income'
-            else:
-                category = 'Other'
-            
-            # Update transaction object (since it's a Pydantic-like model or has these attributes)
-            # Assuming Transaction model has these fields based on common.models
-            # In common.models, it's likely a dataclass or class with these attributes
-            transaction.category = category
+            description = transaction.description.lower()
+            transaction.category = next(
+                (category for keyword, category in _CATEGORY_RULES if keyword in description),
+                'Other'
+            )
         
         # Store categorized transactions
         parser_service.store_transactions(transactions)
@@ -213,7 +350,7 @@ class TestCompleteUserWorkflow:
         
         
         assert len(category_spending) > 0
-        assert any(c['category'] == 'Dining' for c in category_spending)
+        assert 'Dining' in {c['category'] for c in category_spending}
         
         # Get spending over time
         time_series = analytics_service.get_spending_over_time(
@@ -227,183 +364,46 @@ class TestCompleteUserWorkflow:
         assert all('timestamp' in t for t in time_series)
         assert all('amount' in t for t in time_series)
     
-    def test_full_workflow_predictions_and_alerts(self, setup_aws_resources):
-        """
-        Test workflow: Historical data -> Predictions -> Alerts
-        Requirements: 6.1
-        """
-        resources = setup_aws_resources
-        user_id = 'test-user-002'
-        
-        # Create historical transaction data
-        dynamodb = resources['dynamodb']
-        base_date = datetime.now(UTC) - timedelta(days=60)
-        
-        # Create consistent spending pattern
-        for i in range(60):
-            date = base_date + timedelta(days=i)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': 'Daily Coffee'},
-                    'amount': {'N': '-5.00'},
-                    'category': {'S': 'Dining'},
-                    'categoryConfidence': {'N': '0.9'}
-                }
-            )
-        
-        # Get predictions
-        prediction_service = PredictionService()
-        
-        predictions = prediction_service.predict_spending(user_id, 'Dining', 30)
-        assert predictions is not None
-        assert 'predictedAmount' in predictions
-        assert 'historicalAverage' in predictions
-        
-        # Generate alerts
-        alerts = prediction_service.generate_alerts(user_id)
-        assert isinstance(alerts, list)
-    
-    def test_full_workflow_recommendations(self, setup_aws_resources):
-        """
-        Test workflow: Spending analysis -> Personalized recommendations
-        Requirements: 7.1
-        """
-        resources = setup_aws_resources
-        user_id = 'test-user-003'
-        
-        # Create spending data with savings opportunities
-        dynamodb = resources['dynamodb']
-        base_date = datetime.now() - timedelta(days=30)
-        
-        # High dining spending
-        for i in range(20):
-            date = base_date + timedelta(days=i)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': 'Restaurant'},
-                    'amount': {'N': '-50.00'},
-                    'category': {'S': 'Dining'},
-                    'categoryConfidence': {'N': '0.9'}
-                }
-            )
-        
-        # Get recommendations
-        recommendation_service = RecommendationService()
-        
-        recommendations = recommendation_service.generate_recommendations(user_id)
-        assert isinstance(recommendations, list)
-        assert len(recommendations) > 0
-        
-        # Verify recommendations are ranked
-        if len(recommendations) > 1:
-            for i in range(len(recommendations) - 1):
-                assert recommendations[i]['priority'] >= recommendations[i + 1]['priority']
-    
-    def test_full_workflow_conversational_qa(self, setup_aws_resources):
+    @pytest.mark.parametrize('user_id, seed, check', SEEDED_WORKFLOWS)
+    def test_full_workflow_seeded(self, reset_aws_state, user_id, seed, check):
         """
-        Test workflow: User question -> Context retrieval -> AI response
-        Requirements: 8.1
+        Test workflows that start from stored transaction history.
+        Requirements: 6.1, 7.1, 8.1, 9.1
         """
-        resources = setup_aws_resources
-        user_id = 'test-user-004'
-        
-        # Create transaction data
-        dynamodb = resources['dynamodb']
-        base_date = datetime.now() - timedelta(days=30)
-        
-        for i in range(10):
-            date = base_date + timedelta(days=i * 3)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': 'Coffee Shop'},
-                    'amount': {'N': '-5.50'},
-                    'category': {'S': 'Dining'},
-                    'categoryConfidence': {'N': '0.9'}
-                }
-            )
-        
-        # Ask question
-        conversation_service = ConversationService()
+        bulk_put(reset_aws_state['transactions_table'], seed(user_id))
         
-        question = "How much did I spend on dining last month?"
-        context = conversation_service.get_relevant_context(user_id, question)
-        
-        assert context is not None
-        assert 'relevantTransactions' in context or 'categoryTotals' in context
+        check(user_id)
     
-    def test_full_workflow_monthly_report(self, setup_aws_resources):
+    @pytest.mark.benchmark
+    def test_monthly_report_generation_timing(self, reset_aws_state, benchmark):
         """
-        Test workflow: Monthly data -> Report generation -> Export
-        Requirements: 9.1
+        Time report generation over a month of stored transactions.
+        Runs once as a plain test unless --benchmark is given.
         """
-        resources = setup_aws_resources
-        user_id = 'test-user-005'
-        
-        # Create month of transaction data
-        dynamodb = resources['dynamodb']
-        report_month = datetime.now(UTC).replace(day=1) - timedelta(days=1)
-        
-        for i in range(30):
-            date = report_month.replace(day=1) + timedelta(days=i)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': f'Transaction {i}'},
-                    'amount': {'N': '-25.00'},
-                    'category': {'S': 'Shopping'},
-                    'categoryConfidence': {'N': '0.9'}
-                }
-            )
-        
-        # Generate report
-        report_service = ReportService()
+        user_id = 'test-user-bench'
+        bulk_put(reset_aws_state['transactions_table'], _seed_monthly_report(user_id))
+        report_month = _last_month()
         
-        report = report_service.generate_monthly_report(
+        report = benchmark(
+            ReportService().generate_monthly_report,
             user_id,
             report_month.year,
             report_month.month
         )
         
-        assert report is not None
         assert 'totalSpending' in report
-        assert 'spendingByCategory' in report
-        assert 'month' in report
-        
-        # Export to CSV
-        csv_export = report_service.export_to_csv(report)
-        assert csv_export is not None
-        assert len(csv_export) > 0
 
 
 @pytest.mark.integration
 class TestErrorScenarios:
     """Test error handling across workflows."""
     
-    def test_invalid_file_upload(self, setup_aws_resources):
+    def test_invalid_file_upload(self, reset_aws_state):
         """
         Test error handling for invalid file uploads.
         Requirements: 1.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         upload_service = UploadService()
         
         # Test oversized file
@@ -419,12 +419,12 @@ class TestErrorScenarios:
             upload_service.validate_file('file.txt', 100)
         assert 'type' in str(exc_info.value).lower() or 'format' in str(exc_info.value).lower()
     
-    def test_malformed_csv_parsing(self, setup_aws_resources):
+    def test_malformed_csv_parsing(self, reset_aws_state):
         """
         Test error handling for malformed CSV files.
         Requirements: 2.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-error-001'
         
         # Upload malformed CSV
@@ -451,12 +451,12 @@ class TestErrorScenarios:
         
         assert exc_info.value is not None
     
-    def test_empty_data_analytics(self, setup_aws_resources):
+    def test_empty_data_analytics(self, reset_aws_state):
         """
         Test analytics with no transaction data.
         Requirements: 4.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-empty'
         
         analytics_service = AnalyticsService()
@@ -473,33 +473,20 @@ class TestErrorScenarios:
         
         assert category_spending == [] or len(category_spending) == 0
     
-    def test_insufficient_data_predictions(self, setup_aws_resources):
+    def test_insufficient_data_predictions(self, reset_aws_state):
         """
         Test predictions with insufficient historical data.
         Requirements: 6.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-new'
         
         # Create only 5 days of data (insufficient for predictions)
-        dynamodb = resources['dynamodb']
+        table = resources['transactions_table']
         base_date = datetime.now(UTC) - timedelta(days=5)
         
-        for i in range(5):
-            date = base_date + timedelta(days=i)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': 'Transaction'},
-                    'amount': {'N': '-10.00'},
-                    'category': {'S': 'Dining'},
-                    'categoryConfidence': {'N': '0.9'}
-                }
-            )
+        bulk_put(table, _daily_items(user_id, base_date, 5, description='Transaction',
+                                      amount=_AMT_SMALL, category='Dining'))
         
         prediction_service = PredictionService()
         
@@ -508,12 +495,12 @@ class TestErrorScenarios:
         # Either returns None or low confidence prediction
         assert predictions is not None
     
-    def test_unanswerable_conversation_query(self, setup_aws_resources):
+    def test_unanswerable_conversation_query(self, reset_aws_state):
         """
         Test conversational interface with unanswerable questions.
         Requirements: 8.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-conv'
         
         conversation_service = ConversationService()
@@ -532,38 +519,38 @@ class TestErrorScenarios:
 class TestDataIntegrity:
     """Test data integrity across workflows."""
     
-    def test_duplicate_transaction_prevention(self, setup_aws_resources):
+    def test_duplicate_transaction_prevention(self, reset_aws_state):
         """
         Test that duplicate transactions are not stored.
         Requirements: 2.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-dup'
         
         parser_service = ParserService()
         
         # Create duplicate transactions
-        from common.models import Transaction
+        now = datetime.now(UTC)
         transactions = [
             Transaction(
                 id='txn-1',
                 userId=user_id,
-                date=datetime.now(UTC),
+                date=now,
                 description='Coffee Shop',
                 amount=-5.50,
                 sourceFile='test.csv',
                 rawData='{}',
-                createdAt=datetime.now(UTC)
+                createdAt=now
             ),
             Transaction(
                 id='txn-2',
                 userId=user_id,
-                date=datetime.now(UTC),
+                date=now,
                 description='Coffee Shop',
                 amount=-5.50,
                 sourceFile='test.csv',
                 rawData='{}',
-                createdAt=datetime.now(UTC)
+                createdAt=now
             )
         ]
         
@@ -573,50 +560,56 @@ class TestDataIntegrity:
         # Should only have one transaction
         assert len(unique_transactions) == 1
     
-    def test_category_aggregation_accuracy(self, setup_aws_resources):
+    def test_category_aggregation_accuracy(self, reset_aws_state):
         """
         Test that category totals sum correctly.
         Requirements: 4.1
         """
-        resources = setup_aws_resources
+        resources = reset_aws_state
         user_id = 'test-user-agg'
         
         # Create known transaction amounts
-        dynamodb = resources['dynamodb']
+        table = resources['transactions_table']
         base_date = datetime.now() - timedelta(days=10)
+        now = datetime.now(UTC)
+        created_at = now.isoformat()
         
-        expected_total = 0
+        expected_total = Decimal('0')
         transactions_data = [
-            ('Dining', -25.00),
-            ('Dining', -30.00),
-            ('Transportation', -15.00),
-            ('Shopping', -100.00)
+            ('Dining', Decimal('-25.00')),
+            ('Dining', Decimal('-30.00')),
+            ('Transportation', Decimal('-15.00')),
+            ('Shopping', Decimal('-100.00'))
         ]
         
+        pk = f'USER#{user_id}'
+        base_item = {
+            'PK': pk,
+            'categoryConfidence': _CONFIDENCE,
+            'createdAt': created_at
+        }
+        items = []
         for i, (category, amount) in enumerate(transactions_data):
             expected_total += abs(amount)
             date = base_date + timedelta(days=i)
-            dynamodb.put_item(
-                TableName='n3xfin-transactions',
-                Item={
-                    'PK': {'S': f'USER#{user_id}'},
-                    'SK': {'S': f'TRANSACTION#{date.isoformat()}#{i}'},
-                    'id': {'S': f'txn-{i}'},
-                    'date': {'S': date.isoformat()},
-                    'description': {'S': f'Transaction {i}'},
-                    'amount': {'N': str(amount)},
-                    'category': {'S': category},
-                    'categoryConfidence': {'N': '0.9'},
-                    'createdAt': {'S': datetime.now(UTC).isoformat()},
-                    'GSI1PK': {'S': f'USER#{user_id}#CATEGORY#{category}'},
-                    'GSI1SK': {'S': f'DATE#{date.isoformat()}'}
-                }
-            )
+            iso = date.isoformat()
+            items.append({
+                **base_item,
+                'SK': f'TRANSACTION#{iso}#{i}',
+                'id': f'txn-{i}',
+                'date': iso,
+                'description': f'Transaction {i}',
+                'amount': amount,
+                'category': category,
+                'GSI1PK': f'{pk}#CATEGORY#{category}',
+                'GSI1SK': f'DATE#{iso}'
+            })
+        bulk_put(table, items)
         
         # Get analytics
         analytics_service = AnalyticsService()
         
-        end_date = datetime.now(UTC)
+        end_date = now
         start_date = end_date - timedelta(days=30)
         
         category_spending = analytics_service.get_spending_by_category(
@@ -626,7 +619,8 @@ class TestDataIntegrity:
         )
         
         # Sum all category totals
-        actual_total = sum(abs(c['totalAmount']) for c in category_spending)
+        actual_total = math.fsum(abs(c['totalAmount']) for c in category_spending)
         
-        # Should match expected total
-        assert abs(actual_total - expected_total) < 0.01  # Allow for floating point errors
+        # Should match expected total exactly (fsum is correctly rounded and
+        # the seeded totals are whole dollars)
+        assert actual_total == float(expected_total)
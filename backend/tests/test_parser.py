@@ -1,6 +1,7 @@
 """Unit tests for parser service."""
 import pytest
 import io
+from unittest.mock import MagicMock
 from datetime import datetime
 from parser.parser_service import ParserService
 from common.errors import ProcessingError, ValidationError
@@ -30,7 +31,18 @@ class TestColumnMapping:
         assert 'description' in mapping
         assert 'amount' in mapping
         assert 'balance' in mapping
-    
+
+    def test_detect_keyword_priority(self):
+        """Test that earlier keywords win over later ones across headers."""
+        service = ParserService()
+        headers = ['Transaction Date', 'Memo', 'Debit', 'Running Balance']
+        mapping = service._detect_column_mapping(headers)
+
+        assert mapping['date'] == 'Transaction Date'
+        assert mapping['description'] == 'Memo'
+        assert mapping['amount'] == 'Debit'
+        assert mapping['balance'] == 'Running Balance'
+
     def test_detect_case_insensitive(self):
         """Test case-insensitive column detection."""
         service = ParserService()
@@ -139,7 +151,18 @@ class TestCSVRowParsing:
             transaction = service._parse_csv_row(row, column_mapping, 'user-123', 'test.csv')
             assert transaction is not None
             assert isinstance(transaction.date, datetime)
-    
+
+    def test_parse_date_remembers_format(self):
+        """Test that the matching date format is tried first on later rows."""
+        service = ParserService()
+
+        assert service._parse_date('02/20/2024') == datetime(2024, 2, 20)
+        assert service._last_date_fmt == '%m/%d/%Y'
+
+        # Formats outside the table still fall back to dateutil
+        assert service._parse_date('2024-02-21T10:30:00') == datetime(2024, 2, 21, 10, 30)
+        assert service._parse_date('02/22/2024') == datetime(2024, 2, 22)
+
     def test_parse_row_skip_empty(self):
         """Test that empty rows are skipped."""
         service = ParserService()
@@ -261,6 +284,34 @@ class TestParserServiceMocked:
         assert transactions[1].description == 'Salary'
         assert transactions[1].amount == 2000.00
     
+    def test_parse_csv_shares_import_timestamp(self, parser_service):
+        """Test that rows from one file share a single createdAt."""
+        csv_content = """Date,Description,Amount
+2024-02-20,Coffee Shop,-5.50
+2024-02-21,Salary,2000.00"""
+        
+        parser_service.s3.get_object.return_value = {
+            'Body': io.BytesIO(csv_content.encode('utf-8'))
+        }
+        
+        transactions = parser_service.parse_csv('test-bucket', 'test.csv', 'user-123')
+        
+        assert transactions[0].createdAt is transactions[1].createdAt
+    
+    def test_parse_csv_shares_repeated_descriptions(self, parser_service):
+        """Test that equal descriptions in one file share a single string."""
+        csv_content = """Date,Description,Amount
+2024-02-20,Coffee Shop,-5.50
+2024-02-21,Coffee Shop,-4.75"""
+        
+        parser_service.s3.get_object.return_value = {
+            'Body': io.BytesIO(csv_content.encode('utf-8'))
+        }
+        
+        transactions = parser_service.parse_csv('test-bucket', 'test.csv', 'user-123')
+        
+        assert transactions[0].description is transactions[1].description
+    
     def test_parse_csv_no_headers(self, parser_service):
         """Test error when CSV has no headers."""
         csv_content = ""
@@ -285,3 +336,25 @@ class TestParserServiceMocked:
         with pytest.raises(ProcessingError) as exc_info:
             parser_service.parse_csv('test-bucket', 'test.csv', 'user-123')
         assert 'no valid transactions' in str(exc_info.value.message).lower()
+    
+    def test_store_transactions_skips_failed_batch(self, parser_service):
+        """Test that a failed batch write is not counted and later batches still run."""
+        rows = '\n'.join(f'2024-02-{day:02d},Shop {i},-{i}.00'
+                         for i, day in enumerate(list(range(1, 29)) * 2, start=1))
+        csv_content = 'Date,Description,Amount\n' + rows  # 56 rows: batches of 25, 25, 6
+        parser_service.s3.get_object.return_value = {
+            'Body': io.BytesIO(csv_content.encode('utf-8'))
+        }
+        transactions = parser_service.parse_csv('test-bucket', 'test.csv', 'user-123')
+        
+        batches = [MagicMock(), MagicMock(), MagicMock()]
+        for batch in batches:
+            batch.__enter__.return_value = batch
+            batch.__exit__.return_value = False
+        batches[1].__exit__.side_effect = Exception('ProvisionedThroughputExceededException')
+        parser_service.transactions_table.batch_writer.side_effect = batches
+        
+        stored = parser_service.store_transactions(transactions)
+        
+        assert stored == 31
+        assert [batch.put_item.call_count for batch in batches] == [25, 25, 6]
@@ -3,144 +3,161 @@ Tests for Recommendation Service
 """
 
 import json
+import orjson
 import pytest
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
-from moto import mock_aws
-import boto3
 from unittest.mock import patch, MagicMock
+from freezegun import freeze_time
 
 from recommendation.recommendation_service import RecommendationService
 from recommendation.get_recommendations import lambda_handler
-from common.config import Config
 
 
-@pytest.fixture
-def recommendation_service():
-    """Create recommendation service instance."""
-    with mock_aws():
-        # Create DynamoDB table
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        table = dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        yield RecommendationService()
+# Fixed "now" for this module; every sample date falls in the same month
+FROZEN_NOW = datetime(2024, 1, 27, tzinfo=UTC)
+
+_AI_RECOMMENDATIONS = [
+    {
+        "title": "Reduce Dining Out Frequency",
+        "description": "You're spending $1,200/month on dining. Cooking at home 3 more times per week could save significantly.",
+        "category": "Dining",
+        "potentialSavings": 400.0,
+        "actionItems": [
+            "Plan meals for the week",
+            "Cook in batches on weekends",
+            "Limit dining out to special occasions"
+        ],
+        "priority": 5
+    },
+    {
+        "title": "Optimize Transportation Costs",
+        "description": "Consider carpooling or public transit to reduce gas expenses.",
+        "category": "Transportation",
+        "potentialSavings": 150.0,
+        "actionItems": [
+            "Use public transit twice a week",
+            "Carpool with coworkers"
+        ],
+        "priority": 3
+    }
+]
+
+# Bedrock response bodies, encoded once for the whole module
+_BEDROCK_AI_BODY = orjson.dumps({'content': [{'text': orjson.dumps(_AI_RECOMMENDATIONS).decode()}]})
+_BEDROCK_HANDLER_BODY = orjson.dumps({'content': [{
+    'text': '[{"title": "Test", "description": "Test", "category": "Dining", "potentialSavings": 100, "actionItems": ["Action 1"], "priority": 5}]'
+}]})
+
+
+def _bedrock_mock(body=None, error=None):
+    """Bedrock client mock that returns ``body`` or raises ``error``."""
+    bedrock = MagicMock()
+    if error is not None:
+        bedrock.invoke_model.side_effect = error
+    else:
+        bedrock.invoke_model.return_value = {'body': MagicMock(read=MagicMock(return_value=body))}
+    return bedrock
+
+
+@pytest.fixture(scope="module")
+def shared_recommendation_service(aws_backend):
+    """One recommendation service per module; it only holds boto3 handles."""
+    return RecommendationService()
 
 
 @pytest.fixture
-def sample_transactions():
-    """Create sample transaction data."""
-    transactions = []
-    base_date = datetime.now(UTC) - timedelta(days=25)
+def recommendation_service(shared_recommendation_service, aws_resources):
+    """Module-wide recommendation service; tables are cleared after each test."""
+    return shared_recommendation_service
+
+
+@pytest.fixture(scope="module")
+def recommendation_logic():
+    """RecommendationService without AWS handles, for the pure ranking/analysis helpers."""
+    return RecommendationService.__new__(RecommendationService)
+
+
+def _transaction(txn_date, txn_id, description, amount, category):
+    """Build one seeded transaction item."""
+    return {
+        'PK': f'USER#test-user',
+        'SK': f'TRANSACTION#{txn_date}#{txn_id}',
+        'userId': 'test-user',
+        'date': txn_date,
+        'description': description,
+        'amount': amount,
+        'category': category,
+        'id': txn_id
+    }
+
+
+def _build_sample_transactions():
+    """Build the read-only sample transaction set shared by the module."""
+    base_date = FROZEN_NOW - timedelta(days=25)
+    # Day offsets 0-18 cover every category's schedule; format each date once
+    dates = [(base_date + timedelta(days=day)).isoformat() for day in range(19)]
     
     # High dining spending
-    for i in range(15):
-        txn_date = (base_date + timedelta(days=i)).isoformat()
-        txn_id = f'dining-{i}'
-        transactions.append({
-            'PK': f'USER#test-user',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
-            'userId': 'test-user',
-            'date': txn_date,
-            'description': 'Restaurant',
-            'amount': Decimal('-80.00'),
-            'category': 'Dining',
-            'id': txn_id
-        })
+    dining = [
+        _transaction(dates[i], f'dining-{i}',
+                     'Restaurant', Decimal('-80.00'), 'Dining')
+        for i in range(15)
+    ]
     
     # Moderate transportation
-    for i in range(10):
-        txn_date = (base_date + timedelta(days=i * 2)).isoformat()
-        txn_id = f'transport-{i}'
-        transactions.append({
-            'PK': f'USER#test-user',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
-            'userId': 'test-user',
-            'date': txn_date,
-            'description': 'Gas',
-            'amount': Decimal('-50.00'),
-            'category': 'Transportation',
-            'id': txn_id
-        })
+    transport = [
+        _transaction(dates[i * 2], f'transport-{i}',
+                     'Gas', Decimal('-50.00'), 'Transportation')
+        for i in range(10)
+    ]
     
     # Lower shopping
-    for i in range(5):
-        txn_date = (base_date + timedelta(days=i * 4)).isoformat()
-        txn_id = f'shop-{i}'
-        transactions.append({
-            'PK': f'USER#test-user',
-            'SK': f'TRANSACTION#{txn_date}#{txn_id}',
-            'userId': 'test-user',
-            'date': txn_date,
-            'description': 'Store',
-            'amount': Decimal('-100.00'),
-            'category': 'Shopping',
-            'id': txn_id
-        })
+    shopping = [
+        _transaction(dates[i * 4], f'shop-{i}',
+                     'Store', Decimal('-100.00'), 'Shopping')
+        for i in range(5)
+    ]
     
-    return transactions
+    return tuple(dining + transport + shopping)
 
 
-@patch('src.recommendation.recommendation_service.boto3.client')
-def test_generate_recommendations_with_ai(mock_boto_client, recommendation_service, sample_transactions):
+_SAMPLE_TRANSACTIONS = _build_sample_transactions()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def frozen_time():
+    """Freeze the clock so the recommendation window and sample months are deterministic."""
+    with freeze_time(FROZEN_NOW):
+        yield
+
+
+@pytest.fixture(scope="module")
+def sample_transactions():
+    """Sample transaction data (read-only, shared across the module)."""
+    return _SAMPLE_TRANSACTIONS
+
+
+def insert_transactions(table, transactions):
+    """Write transactions through one batch writer (25 items per request)."""
+    with table.batch_writer() as batch:
+        for txn in transactions:
+            batch.put_item(Item=txn)
+
+
+def test_generate_recommendations_with_ai(recommendation_service, sample_transactions):
     """Test recommendation generation with AI."""
-    # Mock Bedrock response
-    mock_bedrock = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    ai_recommendations = [
-        {
-            "title": "Reduce Dining Out Frequency",
-            "description": "You're spending $1,200/month on dining. Cooking at home 3 more times per week could save significantly.",
-            "category": "Dining",
-            "potentialSavings": 400.0,
-            "actionItems": [
-                "Plan meals for the week",
-                "Cook in batches on weekends",
-                "Limit dining out to special occasions"
-            ],
-            "priority": 5
-        },
-        {
-            "title": "Optimize Transportation Costs",
-            "description": "Consider carpooling or public transit to reduce gas expenses.",
-            "category": "Transportation",
-            "potentialSavings": 150.0,
-            "actionItems": [
-                "Use public transit twice a week",
-                "Carpool with coworkers"
-            ],
-            "priority": 3
-        }
-    ]
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': json.dumps(ai_recommendations)
-        }]
-    }).encode()
-    mock_bedrock.invoke_model.return_value = mock_response
-    mock_boto_client.return_value = mock_bedrock
+    bedrock = _bedrock_mock(_BEDROCK_AI_BODY)
     
     # Insert transactions
-    table = recommendation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(recommendation_service.transactions_table, sample_transactions)
     
     # Generate recommendations
-    recommendations = recommendation_service.generate_recommendations('test-user')
+    with patch.object(recommendation_service, 'bedrock', bedrock):
+        recommendations = recommendation_service.generate_recommendations('test-user')
     
-    assert len(recommendations) > 0
+    bedrock.invoke_model.assert_called_once()
+    assert [rec['title'] for rec in recommendations] == [rec['title'] for rec in _AI_RECOMMENDATIONS]
     
     # Check structure
     rec = recommendations[0]
@@ -158,13 +175,13 @@ def test_generate_recommendations_with_ai(mock_boto_client, recommendation_servi
 def test_generate_recommendations_insufficient_data(recommendation_service):
     """Test recommendations with insufficient data."""
     # Add only a few transactions
-    table = recommendation_service.transactions_table
     base_date = datetime.now(UTC) - timedelta(days=10)
+    transactions = []
     
     for i in range(3):
         txn_date = (base_date + timedelta(days=i)).isoformat()
         txn_id = f'txn-{i}'
-        table.put_item(Item={
+        transactions.append({
             'PK': f'USER#test-user',
             'SK': f'TRANSACTION#{txn_date}#{txn_id}',
             'userId': 'test-user',
@@ -174,6 +191,7 @@ def test_generate_recommendations_insufficient_data(recommendation_service):
             'category': 'Dining',
             'id': txn_id
         })
+    insert_transactions(recommendation_service.transactions_table, transactions)
     
     recommendations = recommendation_service.generate_recommendations('test-user')
     
@@ -190,20 +208,18 @@ def test_generate_recommendations_no_data(recommendation_service):
     assert recommendations[0]['id'] == 'insufficient-data'
 
 
-@patch('src.recommendation.recommendation_service.boto3.client')
-def test_generate_recommendations_fallback(mock_boto_client, recommendation_service, sample_transactions):
+def test_generate_recommendations_fallback(recommendation_service, sample_transactions):
     """Test fallback recommendations when AI fails."""
     # Mock Bedrock failure
-    mock_bedrock = MagicMock()
-    mock_bedrock.invoke_model.side_effect = Exception("Bedrock error")
-    mock_boto_client.return_value = mock_bedrock
+    bedrock = _bedrock_mock(error=Exception("Bedrock error"))
     
     # Insert transactions
-    table = recommendation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(recommendation_service.transactions_table, sample_transactions)
     
-    recommendations = recommendation_service.generate_recommendations('test-user')
+    with patch.object(recommendation_service, 'bedrock', bedrock):
+        recommendations = recommendation_service.generate_recommendations('test-user')
+    
+    bedrock.invoke_model.assert_called_once()
     
     # Should return fallback recommendations
     assert len(recommendations) > 0
@@ -212,7 +228,7 @@ def test_generate_recommendations_fallback(mock_boto_client, recommendation_serv
     assert all('potentialSavings' in rec for rec in recommendations)
 
 
-def test_rank_recommendations(recommendation_service):
+def test_rank_recommendations(recommendation_logic):
     """Test recommendation ranking by potential savings."""
     recommendations = [
         {
@@ -235,7 +251,7 @@ def test_rank_recommendations(recommendation_service):
         }
     ]
     
-    ranked = recommendation_service.rank_recommendations(recommendations)
+    ranked = recommendation_logic.rank_recommendations(recommendations)
     
     # Should be sorted by savings (descending)
     assert ranked[0]['id'] == '2'  # Highest savings
@@ -243,7 +259,7 @@ def test_rank_recommendations(recommendation_service):
     assert ranked[2]['id'] == '1'  # Lowest savings
 
 
-def test_rank_recommendations_by_priority(recommendation_service):
+def test_rank_recommendations_by_priority(recommendation_logic):
     """Test ranking when savings are equal."""
     recommendations = [
         {
@@ -260,16 +276,16 @@ def test_rank_recommendations_by_priority(recommendation_service):
         }
     ]
     
-    ranked = recommendation_service.rank_recommendations(recommendations)
+    ranked = recommendation_logic.rank_recommendations(recommendations)
     
     # Should be sorted by priority when savings are equal
     assert ranked[0]['id'] == '2'  # Higher priority
     assert ranked[1]['id'] == '1'  # Lower priority
 
 
-def test_analyze_category_spending(recommendation_service, sample_transactions):
+def test_analyze_category_spending(recommendation_logic, sample_transactions):
     """Test category spending analysis."""
-    category_data = recommendation_service._build_monthly_breakdown(sample_transactions)
+    category_data = recommendation_logic._build_monthly_breakdown(sample_transactions)
     
     assert 'Dining' in category_data
     assert 'Transportation' in category_data
@@ -277,10 +293,8 @@ def test_analyze_category_spending(recommendation_service, sample_transactions):
     
     # Check Dining data (latest month)
     dining = category_data['Dining']
-    # base_date is ~25 days ago, so it's likely the same month if today is early in the month, 
-    # but in our sample_transactions generation, it uses datetime.now(UTC) - 25 days.
-    # We should check the actual month key.
-    month_key = (datetime.now(UTC) - timedelta(days=25)).strftime('%Y-%m')
+    # All sample dates fall in the frozen month
+    month_key = (FROZEN_NOW - timedelta(days=25)).strftime('%Y-%m')
     assert dining[month_key] == Decimal('1200.00')  # 15 * 80
     
     # Check Transportation data
@@ -288,7 +302,7 @@ def test_analyze_category_spending(recommendation_service, sample_transactions):
     assert transport[month_key] == Decimal('500.00')  # 10 * 50
 
 
-def test_analyze_category_spending_excludes_income(recommendation_service):
+def test_analyze_category_spending_excludes_income(recommendation_logic):
     """Test that income is excluded from spending analysis."""
     now_iso = datetime.now(UTC).isoformat()
     transactions = [
@@ -314,14 +328,14 @@ def test_analyze_category_spending_excludes_income(recommendation_service):
         }
     ]
     
-    category_data = recommendation_service._build_monthly_breakdown(transactions)
+    category_data = recommendation_logic._build_monthly_breakdown(transactions)
     
     # Income should not be in the analysis
     assert 'Income' not in category_data
     assert 'Dining' in category_data
 
 
-def test_generate_fallback_recommendations(recommendation_service):
+def test_generate_fallback_recommendations(recommendation_logic):
     """Test fallback recommendation generation."""
     category_spending = {
         'Dining': {
@@ -336,7 +350,7 @@ def test_generate_fallback_recommendations(recommendation_service):
     }
     total_spending = Decimal('2400.00')
     
-    recommendations = recommendation_service._generate_fallback_recommendations(
+    recommendations = recommendation_logic._generate_fallback_recommendations(
         category_spending,
         {}, # spike_categories
         '2024-01', # latest_month
@@ -366,23 +380,11 @@ def test_generate_fallback_recommendations(recommendation_service):
 @patch('src.recommendation.recommendation_service.boto3.client')
 def test_lambda_handler(mock_boto_client, recommendation_service, sample_transactions):
     """Test recommendations Lambda handler."""
-    # Mock Bedrock
-    mock_bedrock = MagicMock()
-    mock_response = {
-        'body': MagicMock()
-    }
-    mock_response['body'].read.return_value = json.dumps({
-        'content': [{
-            'text': '[{"title": "Test", "description": "Test", "category": "Dining", "potentialSavings": 100, "actionItems": ["Action 1"], "priority": 5}]'
-        }]
-    }).encode()
-    mock_bedrock.invoke_model.return_value = mock_response
-    mock_boto_client.return_value = mock_bedrock
+    # The handler builds its own service, so Bedrock is mocked at client creation
+    mock_boto_client.return_value = _bedrock_mock(_BEDROCK_HANDLER_BODY)
     
     # Insert transactions
-    table = recommendation_service.transactions_table
-    for txn in sample_transactions:
-        table.put_item(Item=txn)
+    insert_transactions(recommendation_service.transactions_table, sample_transactions)
     
     event = {
         'requestContext': {
@@ -400,7 +402,7 @@ def test_lambda_handler(mock_boto_client, recommendation_service, sample_transac
     body = json.loads(response['body'])
     assert 'recommendations' in body
     assert 'count' in body
-    assert len(body['recommendations']) > 0
+    assert [rec['title'] for rec in body['recommendations']] == ['Test']
 
 
 def test_lambda_handler_unauthorized():
@@ -4,53 +4,25 @@ Unit tests for Report Service.
 
 import pytest
 import json
+import re
 from datetime import datetime, timedelta, UTC
 from decimal import Decimal
-from moto import mock_aws
-import boto3
 
 from report.report_service import ReportService
 from report.generate_report import lambda_handler
 from common.errors import ValidationError
-from common.config import Config
+
+
+@pytest.fixture(scope="module")
+def shared_report_service(aws_backend):
+    """One report service per module; it only holds boto3 handles."""
+    return ReportService()
 
 
 @pytest.fixture
-def report_service():
-    """Create ReportService instance with mocked AWS services."""
-    with mock_aws():
-        # Create DynamoDB tables
-        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-        
-        # Transactions table
-        transactions_table = dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        # Reports table
-        reports_table = dynamodb.create_table(
-            TableName=Config.DYNAMODB_TABLE_REPORTS,
-            KeySchema=[
-                {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'PK', 'AttributeType': 'S'},
-                {'AttributeName': 'SK', 'AttributeType': 'S'}
-            ],
-            BillingMode='PAY_PER_REQUEST'
-        )
-        
-        yield ReportService()
+def report_service(shared_report_service, aws_resources):
+    """Module-wide report service; tables are cleared after each test."""
+    return shared_report_service
 
 
 def create_transaction(user_id, date, amount, category='Dining', description='Test'):
@@ -69,6 +41,64 @@ def create_transaction(user_id, date, amount, category='Dining', description='Te
     }
 
 
+# Seed data built once at import (Decimals are immutable, so items are shared)
+_JAN_2024_TXNS = (
+    create_transaction('user123', datetime(2024, 1, 5), -50.00, 'Dining'),
+    create_transaction('user123', datetime(2024, 1, 10), -100.00, 'Shopping'),
+    create_transaction('user123', datetime(2024, 1, 15), -30.00, 'Dining'),
+    create_transaction('user123', datetime(2024, 1, 20), 2000.00, 'Income')
+)
+
+_DEC_2023_TXNS = (
+    create_transaction('user123', datetime(2023, 12, 5), -100.00, 'Dining'),
+    create_transaction('user123', datetime(2023, 12, 10), -200.00, 'Shopping')
+)
+
+
+# Stored report used by the CSV export test (export_to_csv only reads it)
+_SAMPLE_REPORT = {
+    'reportId': 'user123-2024-01',
+    'userId': 'user123',
+    'month': '2024-01',
+    'totalSpending': 180.0,
+    'totalIncome': 2000.0,
+    'spendingByCategory': {
+        'Dining': {'total': 80.0, 'count': 2, 'percentage': 44.4},
+        'Shopping': {'total': 100.0, 'count': 1, 'percentage': 55.6}
+    },
+    'savingsRate': 91.0,
+    'trends': [
+        {'category': 'Overall Spending', 'direction': 'increasing', 'percentageChange': 20.0}
+    ],
+    'insights': ['Great savings rate!', 'Dining is your top category'],
+    'recommendations': [
+        {
+            'title': 'Reduce Dining',
+            'potentialSavings': 12.0,
+            'actionItems': ['Review expenses', 'Set budget']
+        }
+    ],
+    'transactionCount': 3,
+    'generatedAt': '2024-01-31T12:00:00'
+}
+
+# Text the CSV export must contain, matched in one pass. Longer needles come
+# first so 'Reduce Dining' wins over 'Dining' where both start at one offset;
+# 'Dining' itself still has to appear on its own (the category row).
+_CSV_EXPECTED = (
+    'N3xFin Monthly Financial Report', 'Great savings rate!', 'Reduce Dining',
+    '$2000.00', '$180.00', 'Shopping', '2024-01', 'Dining', '91.0%'
+)
+_CSV_EXPECTED_RE = re.compile('|'.join(map(re.escape, _CSV_EXPECTED)))
+
+
+def insert_transactions(table, transactions):
+    """Write transactions through one batch writer (25 items per request)."""
+    with table.batch_writer() as batch:
+        for txn in transactions:
+            batch.put_item(Item=txn)
+
+
 class TestReportService:
     """Test ReportService functionality."""
     
@@ -76,13 +106,16 @@ class TestReportService:
         """Test report generation with no transactions."""
         report = report_service.generate_monthly_report('user123', 2024, 1)
         
-        assert report['userId'] == 'user123'
-        assert report['month'] == '2024-01'
-        assert report['totalSpending'] == 0.0
-        assert report['totalIncome'] == 0.0
-        assert report['spendingByCategory'] == {}
-        assert report['savingsRate'] == 0.0
-        assert report['transactionCount'] == 0
+        expected = {
+            'userId': 'user123',
+            'month': '2024-01',
+            'totalSpending': 0.0,
+            'totalIncome': 0.0,
+            'spendingByCategory': {},
+            'savingsRate': 0.0,
+            'transactionCount': 0
+        }
+        assert {key: report[key] for key in expected} == expected
         assert 'No transactions found' in report['insights'][0]
     
     def test_generate_report_with_transactions(self, report_service):
@@ -90,16 +123,7 @@ class TestReportService:
         user_id = 'user123'
         
         # Add transactions for January 2024
-        transactions = [
-            create_transaction(user_id, datetime(2024, 1, 5), -50.00, 'Dining'),
-            create_transaction(user_id, datetime(2024, 1, 10), -100.00, 'Shopping'),
-            create_transaction(user_id, datetime(2024, 1, 15), -30.00, 'Dining'),
-            create_transaction(user_id, datetime(2024, 1, 20), 2000.00, 'Income')
-        ]
-        
-        table = report_service.transactions_table
-        for txn in transactions:
-            table.put_item(Item=txn)
+        insert_transactions(report_service.transactions_table, _JAN_2024_TXNS)
         
         report = report_service.generate_monthly_report(user_id, 2024, 1)
         
@@ -124,9 +148,57 @@ class TestReportService:
         
         with pytest.raises(ValidationError, match="Month must be between 1 and 12"):
             report_service.generate_monthly_report('user123', 2024, 0)
+    
+    def test_calculate_monthly_trends(self, report_service, mocker):
+        """Test monthly trend calculation."""
+        user_id = 'user123'
+        
+        # Previous month (December 2023) comes straight from memory; the
+        # range query itself is covered by test_generate_report_with_transactions
+        fetch = mocker.patch.object(report_service, '_get_transactions_in_range',
+                                    return_value=list(_DEC_2023_TXNS))
+        
+        # Current month data (January 2024)
+        current_data = {
+            'totalSpending': 450.0,  # 50% increase
+            'totalIncome': 2000.0
+        }
+        
+        trends = report_service._calculate_monthly_trends(user_id, 2024, 1, current_data)
+        
+        fetch.assert_called_once_with(user_id, datetime(2023, 12, 1), datetime(2023, 12, 31))
+        assert len(trends) == 1
+        assert trends[0]['category'] == 'Overall Spending'
+        assert trends[0]['direction'] == 'increasing'
+        assert trends[0]['percentageChange'] == 50.0
+    
+    def test_calculate_monthly_trends_no_previous_data(self, report_service):
+        """Test trend calculation with no previous month data."""
+        current_data = {
+            'totalSpending': 450.0,
+            'totalIncome': 2000.0
+        }
+        
+        trends = report_service._calculate_monthly_trends('user123', 2024, 1, current_data)
+        
+        assert trends == []
+    
+    def test_export_to_csv(self, report_service):
+        """Test CSV export functionality."""
+        csv_output = report_service.export_to_csv(_SAMPLE_REPORT)
+        
+        assert set(_CSV_EXPECTED) - set(_CSV_EXPECTED_RE.findall(csv_output)) == set()
+
 
+class TestReportCalculations:
+    """Test the pure report calculations (no AWS backend needed)."""
     
-    def test_calculate_spending_and_income(self, report_service):
+    @pytest.fixture(scope="class")
+    def report_logic(self):
+        """ReportService without AWS handles; these helpers only read their arguments."""
+        return ReportService.__new__(ReportService)
+    
+    def test_calculate_spending_and_income(self, report_logic):
         """Test spending and income calculation."""
         transactions = [
             {'amount': Decimal('-50.00')},
@@ -135,12 +207,12 @@ class TestReportService:
             {'amount': Decimal('500.00')}
         ]
         
-        result = report_service._calculate_spending_and_income(transactions)
+        result = report_logic._calculate_spending_and_income(transactions)
         
         assert result['totalSpending'] == 150.0
         assert result['totalIncome'] == 2500.0
     
-    def test_calculate_category_breakdown(self, report_service):
+    def test_calculate_category_breakdown(self, report_logic):
         """Test category breakdown calculation."""
         transactions = [
             {'amount': Decimal('-50.00'), 'category': 'Dining'},
@@ -149,7 +221,7 @@ class TestReportService:
             {'amount': Decimal('2000.00'), 'category': 'Income'}  # Should be ignored
         ]
         
-        breakdown = report_service._calculate_category_breakdown(transactions)
+        breakdown = report_logic._calculate_category_breakdown(transactions)
         
         assert len(breakdown) == 2
         assert breakdown['Dining']['total'] == 80.0
@@ -159,63 +231,17 @@ class TestReportService:
         assert breakdown['Shopping']['count'] == 1
         assert breakdown['Shopping']['percentage'] == 55.6
     
-    def test_calculate_savings_rate(self, report_service):
+    @pytest.mark.parametrize('income,spending,expected', [
+        (2000.0, 1500.0, 25.0),   # Positive savings
+        (2000.0, 2000.0, 0.0),    # No savings
+        (2000.0, 2500.0, -25.0),  # Negative savings (overspending)
+        (0.0, 100.0, 0.0),        # No income
+    ])
+    def test_calculate_savings_rate(self, report_logic, income, spending, expected):
         """Test savings rate calculation."""
-        # Positive savings
-        rate = report_service._calculate_savings_rate(2000.0, 1500.0)
-        assert rate == 25.0
-        
-        # No savings
-        rate = report_service._calculate_savings_rate(2000.0, 2000.0)
-        assert rate == 0.0
-        
-        # Negative savings (overspending)
-        rate = report_service._calculate_savings_rate(2000.0, 2500.0)
-        assert rate == -25.0
-        
-        # No income
-        rate = report_service._calculate_savings_rate(0.0, 100.0)
-        assert rate == 0.0
-    
-    def test_calculate_monthly_trends(self, report_service):
-        """Test monthly trend calculation."""
-        user_id = 'user123'
-        
-        # Add transactions for December 2023
-        prev_transactions = [
-            create_transaction(user_id, datetime(2023, 12, 5), -100.00, 'Dining'),
-            create_transaction(user_id, datetime(2023, 12, 10), -200.00, 'Shopping')
-        ]
-        
-        table = report_service.transactions_table
-        for txn in prev_transactions:
-            table.put_item(Item=txn)
-        
-        # Current month data (January 2024)
-        current_data = {
-            'totalSpending': 450.0,  # 50% increase
-            'totalIncome': 2000.0
-        }
-        
-        trends = report_service._calculate_monthly_trends(user_id, 2024, 1, current_data)
-        
-        assert len(trends) == 1
-        assert trends[0]['category'] == 'Overall Spending'
-        assert trends[0]['direction'] == 'increasing'
-        assert trends[0]['percentageChange'] == 50.0
-    
-    def test_calculate_monthly_trends_no_previous_data(self, report_service):
-        """Test trend calculation with no previous month data."""
-        current_data = {
-            'totalSpending': 450.0,
-            'totalIncome': 2000.0
-        }
-        
-        trends = report_service._calculate_monthly_trends('user123', 2024, 1, current_data)
-        
-        assert trends == []
+        assert report_logic._calculate_savings_rate(income, spending) == expected
     
-    def test_generate_fallback_insights(self, report_service):
+    def test_generate_fallback_insights(self, report_logic):
         """Test fallback insights generation."""
         spending_data = {'totalSpending': 1500.0, 'totalIncome': 2000.0}
         category_breakdown = {
@@ -224,7 +250,7 @@ class TestReportService:
         }
         savings_rate = 25.0
         
-        insights = report_service._generate_fallback_insights(
+        insights = report_logic._generate_fallback_insights(
             spending_data,
             category_breakdown,
             savings_rate
@@ -234,7 +260,7 @@ class TestReportService:
         assert any('25.0%' in insight for insight in insights)
         assert any('Dining' in insight for insight in insights)
     
-    def test_generate_recommendations(self, report_service):
+    def test_generate_recommendations(self, report_logic):
         """Test recommendations generation."""
         category_breakdown = {
             'Dining': {'total': 500.0, 'count': 10, 'percentage': 50.0},
@@ -242,161 +268,66 @@ class TestReportService:
             'Transportation': {'total': 200.0, 'count': 8, 'percentage': 20.0}
         }
         
-        recommendations = report_service._generate_recommendations(category_breakdown, 1000.0)
+        recommendations = report_logic._generate_recommendations(category_breakdown, 1000.0)
         
         assert len(recommendations) == 2
         assert recommendations[0]['category'] == 'Dining'
         assert recommendations[0]['potentialSavings'] == 75.0  # 15% of 500
         assert recommendations[1]['category'] == 'Shopping'
         assert len(recommendations[0]['actionItems']) >= 3
-    
-    def test_export_to_csv(self, report_service):
-        """Test CSV export functionality."""
-        report = {
-            'reportId': 'user123-2024-01',
-            'userId': 'user123',
-            'month': '2024-01',
-            'totalSpending': 180.0,
-            'totalIncome': 2000.0,
-            'spendingByCategory': {
-                'Dining': {'total': 80.0, 'count': 2, 'percentage': 44.4},
-                'Shopping': {'total': 100.0, 'count': 1, 'percentage': 55.6}
-            },
-            'savingsRate': 91.0,
-            'trends': [
-                {'category': 'Overall Spending', 'direction': 'increasing', 'percentageChange': 20.0}
-            ],
-            'insights': ['Great savings rate!', 'Dining is your top category'],
-            'recommendations': [
-                {
-                    'title': 'Reduce Dining',
-                    'potentialSavings': 12.0,
-                    'actionItems': ['Review expenses', 'Set budget']
-                }
-            ],
-            'transactionCount': 3,
-            'generatedAt': '2024-01-31T12:00:00'
-        }
-        
-        csv_output = report_service.export_to_csv(report)
-        
-        assert 'N3xFin Monthly Financial Report' in csv_output
-        assert '2024-01' in csv_output
-        assert '$180.00' in csv_output
-        assert '$2000.00' in csv_output
-        assert '91.0%' in csv_output
-        assert 'Dining' in csv_output
-        assert 'Shopping' in csv_output
-        assert 'Great savings rate!' in csv_output
-        assert 'Reduce Dining' in csv_output
 
 
 class TestGenerateReportLambda:
     """Test generate_report Lambda function."""
     
-    def test_lambda_handler_success(self):
+    def test_lambda_handler_success(self, aws_resources):
         """Test successful report generation via Lambda."""
-        with mock_aws():
-            # Setup DynamoDB
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_REPORTS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            
-            event = {
-                'requestContext': {
-                    'authorizer': {
-                        'claims': {
-                            'sub': 'user123'
-                        }
+        event = {
+            'requestContext': {
+                'authorizer': {
+                    'claims': {
+                        'sub': 'user123'
                     }
-                },
-                'queryStringParameters': {
-                    'year': '2024',
-                    'month': '1'
                 }
+            },
+            'queryStringParameters': {
+                'year': '2024',
+                'month': '1'
             }
-            
-            response = lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            assert body['userId'] == 'user123'
-            assert body['month'] == '2024-01'
+        }
+        
+        response = lambda_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['userId'] == 'user123'
+        assert body['month'] == '2024-01'
     
-    def test_lambda_handler_default_month(self):
+    def test_lambda_handler_default_month(self, aws_resources):
         """Test Lambda with default month (current month)."""
-        with mock_aws():
-            # Setup DynamoDB
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_REPORTS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            
-            event = {
-                'requestContext': {
-                    'authorizer': {
-                        'claims': {
-                            'sub': 'user123'
-                        }
+        event = {
+            'requestContext': {
+                'authorizer': {
+                    'claims': {
+                        'sub': 'user123'
                     }
-                },
-                'queryStringParameters': None
-            }
-            
-            response = lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            assert body['userId'] == 'user123'
-            # Should use current month
-            now = datetime.now(UTC)
-            assert body['month'] == f"{now.year}-{now.month:02d}"
+                }
+            },
+            'queryStringParameters': None
+        }
+        
+        response = lambda_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['userId'] == 'user123'
+        # Should use current month
+        now = datetime.now(UTC)
+        assert body['month'] == f"{now.year}-{now.month:02d}"
     
-    def test_lambda_handler_unauthorized(self):
-        """Test Lambda without authorization."""
+    def test_lambda_handler_unauthorized(self, mocker):
+        """Test Lambda without authorization (rejected before any AWS client is built)."""
+        service_cls = mocker.patch('report.generate_report.ReportService')
         event = {
             'requestContext': {},
             'queryStringParameters': None
@@ -404,56 +335,29 @@ class TestGenerateReportLambda:
         
         response = lambda_handler(event, None)
         
+        service_cls.assert_not_called()
         assert response['statusCode'] == 401
         body = json.loads(response['body'])
         assert 'Unauthorized' in body['error']
     
-    def test_lambda_handler_invalid_month(self):
+    def test_lambda_handler_invalid_month(self, aws_resources):
         """Test Lambda with invalid month."""
-        with mock_aws():
-            # Setup DynamoDB
-            dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_TRANSACTIONS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            dynamodb.create_table(
-                TableName=Config.DYNAMODB_TABLE_REPORTS,
-                KeySchema=[
-                    {'AttributeName': 'PK', 'KeyType': 'HASH'},
-                    {'AttributeName': 'SK', 'KeyType': 'RANGE'}
-                ],
-                AttributeDefinitions=[
-                    {'AttributeName': 'PK', 'AttributeType': 'S'},
-                    {'AttributeName': 'SK', 'AttributeType': 'S'}
-                ],
-                BillingMode='PAY_PER_REQUEST'
-            )
-            
-            event = {
-                'requestContext': {
-                    'authorizer': {
-                        'claims': {
-                            'sub': 'user123'
-                        }
+        event = {
+            'requestContext': {
+                'authorizer': {
+                    'claims': {
+                        'sub': 'user123'
                     }
-                },
-                'queryStringParameters': {
-                    'year': '2024',
-                    'month': '13'
                 }
+            },
+            'queryStringParameters': {
+                'year': '2024',
+                'month': '13'
             }
-            
-            response = lambda_handler(event, None)
-            
-            assert response['statusCode'] == 400
-            body = json.loads(response['body'])
-            assert 'error' in body
+        }
+        
+        response = lambda_handler(event, None)
+        
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert 'error' in body
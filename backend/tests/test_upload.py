@@ -1,76 +1,102 @@
 """Unit tests for upload service."""
 import pytest
+from datetime import datetime
+from unittest.mock import Mock
 from upload.upload_service import UploadService
 from common.errors import ValidationError
 from common.config import config
 
 
+# Canned S3 responses shared by the mocked-client tests (read-only)
+_HEAD_RESP = {
+    'ContentLength': 1024000,
+    'ContentType': 'text/csv',
+    'LastModified': datetime(2024, 2, 20, 12, 0, 0),
+    'ServerSideEncryption': 'AES256',
+    'Metadata': {
+        'original-filename': 'statement.csv',
+        'user-id': 'user-123'
+    }
+}
+
+_LIST_RESP = {
+    'Contents': [
+        {
+            'Key': 'users/user-123/statements/file1.csv',
+            'Size': 1024,
+            'LastModified': datetime(2024, 2, 20, 12, 0, 0)
+        },
+        {
+            'Key': 'users/user-123/statements/file2.pdf',
+            'Size': 2048,
+            'LastModified': datetime(2024, 2, 21, 12, 0, 0)
+        }
+    ]
+}
+
+
 class TestFileValidation:
     """Test file validation logic."""
     
-    def test_valid_csv_file(self):
+    @pytest.fixture(scope="class")
+    def validation_service(self):
+        """One UploadService for the class; validate_file only reads its arguments."""
+        return UploadService()
+    
+    def test_valid_csv_file(self, validation_service):
         """Test that valid CSV files pass validation."""
-        service = UploadService()
-        is_valid, file_type, error = service.validate_file('statement.csv', 1024000)
+        is_valid, file_type, error = validation_service.validate_file('statement.csv', 1024000)
         assert is_valid is True
         assert file_type == 'csv'
         assert error == ''
     
-    def test_valid_pdf_file(self):
+    def test_valid_pdf_file(self, validation_service):
         """Test that valid PDF files pass validation."""
-        service = UploadService()
-        is_valid, file_type, error = service.validate_file('statement.pdf', 2048000)
+        is_valid, file_type, error = validation_service.validate_file('statement.pdf', 2048000)
         assert is_valid is True
         assert file_type == 'pdf'
         assert error == ''
     
-    def test_file_too_large(self):
+    def test_file_too_large(self, validation_service):
         """Test that oversized files are rejected."""
-        service = UploadService()
         max_size = config.MAX_FILE_SIZE_BYTES
         with pytest.raises(ValidationError) as exc_info:
-            service.validate_file('large.csv', max_size + 1)
+            validation_service.validate_file('large.csv', max_size + 1)
         assert 'exceeds' in str(exc_info.value.message).lower()
     
-    def test_empty_file(self):
+    def test_empty_file(self, validation_service):
         """Test that empty files are rejected."""
-        service = UploadService()
         with pytest.raises(ValidationError) as exc_info:
-            service.validate_file('empty.csv', 0)
+            validation_service.validate_file('empty.csv', 0)
         assert 'empty' in str(exc_info.value.message).lower()
     
-    def test_invalid_file_type(self):
+    def test_invalid_file_type(self, validation_service):
         """Test that unsupported file types are rejected."""
-        service = UploadService()
         with pytest.raises(ValidationError) as exc_info:
-            service.validate_file('document.txt', 1024)
+            validation_service.validate_file('document.txt', 1024)
         assert 'invalid file type' in str(exc_info.value.message).lower()
     
-    def test_invalid_filename_too_long(self):
+    def test_invalid_filename_too_long(self, validation_service):
         """Test that excessively long filenames are rejected."""
-        service = UploadService()
         long_filename = 'a' * 256 + '.csv'
         with pytest.raises(ValidationError) as exc_info:
-            service.validate_file(long_filename, 1024)
+            validation_service.validate_file(long_filename, 1024)
         assert 'filename' in str(exc_info.value.message).lower()
     
-    def test_dangerous_filename_characters(self):
+    @pytest.mark.parametrize('filename', [
+        '../../../etc/passwd.csv',
+        'file<script>.csv',
+        'file|pipe.csv',
+        'file?.csv'
+    ])
+    def test_dangerous_filename_characters(self, validation_service, filename):
         """Test that filenames with dangerous characters are rejected."""
-        service = UploadService()
-        dangerous_filenames = [
-            '../../../etc/passwd.csv',
-            'file<script>.csv',
-            'file|pipe.csv',
-            'file?.csv'
-        ]
-        for filename in dangerous_filenames:
-            with pytest.raises(ValidationError):
-                service.validate_file(filename, 1024)
-    
-    def test_case_insensitive_extension(self):
+        with pytest.raises(ValidationError):
+            validation_service.validate_file(filename, 1024)
+    
+    def test_case_insensitive_extension(self, validation_service):
         """Test that file extensions are case-insensitive."""
-        service = UploadService()
-        is_valid, file_type, error = service.validate_file('STATEMENT.CSV', 1024)
+        is_valid, file_type, error = validation_service.validate_file('STATEMENT.CSV', 1024)
         assert is_valid is True
         assert file_type == 'csv'
 
@@ -78,14 +104,20 @@ class TestFileValidation:
 class TestUploadServiceMocked:
     """Test UploadService with mocked S3 client."""
     
-    @pytest.fixture
-    def upload_service(self, mocker):
-        """Create UploadService with mocked S3 client."""
+    @pytest.fixture(scope="class")
+    def upload_service(self):
+        """Create one UploadService with a mocked S3 client for the class."""
         service = UploadService()
-        service.s3 = mocker.Mock()
+        service.s3 = Mock()
         service.bucket = 'test-bucket'
         return service
     
+    @pytest.fixture(autouse=True)
+    def reset_s3(self, upload_service):
+        """Clear calls, return values and side effects left by the previous test."""
+        yield
+        upload_service.s3.reset_mock(return_value=True, side_effect=True)
+    
     def test_generate_upload_url_success(self, upload_service):
         """Test successful presigned URL generation."""
         upload_service.s3.generate_presigned_url.return_value = 'https://s3.amazonaws.com/presigned-url'
@@ -106,17 +138,7 @@ class TestUploadServiceMocked:
     
     def test_verify_upload_success(self, upload_service):
         """Test successful upload verification."""
-        from datetime import datetime
-        upload_service.s3.head_object.return_value = {
-            'ContentLength': 1024000,
-            'ContentType': 'text/csv',
-            'LastModified': datetime(2024, 2, 20, 12, 0, 0),
-            'ServerSideEncryption': 'AES256',
-            'Metadata': {
-                'original-filename': 'statement.csv',
-                'user-id': 'user-123'
-            }
-        }
+        upload_service.s3.head_object.return_value = _HEAD_RESP
         
         result = upload_service.verify_upload('users/user-123/statements/file.csv')
         
@@ -140,21 +162,7 @@ class TestUploadServiceMocked:
     
     def test_list_user_files(self, upload_service):
         """Test listing user files."""
-        from datetime import datetime
-        upload_service.s3.list_objects_v2.return_value = {
-            'Contents': [
-                {
-                    'Key': 'users/user-123/statements/file1.csv',
-                    'Size': 1024,
-                    'LastModified': datetime(2024, 2, 20, 12, 0, 0)
-                },
-                {
-                    'Key': 'users/user-123/statements/file2.pdf',
-                    'Size': 2048,
-                    'LastModified': datetime(2024, 2, 21, 12, 0, 0)
-                }
-            ]
-        }
+        upload_service.s3.list_objects_v2.return_value = _LIST_RESP
         
         files = upload_service.list_user_files('user-123')
         